@@ -5,13 +5,13 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-try:
-    import pycountry_convert as pc
-except ModuleNotFoundError:
-    pc = None
 import math
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent))
+from country_continents import MAPPING_FILE, load_continent_map
+
 st.set_page_config(page_title="Global Economy Dashboard", layout="wide")
 
 st.title("🌍 Global Economy Indicators — Interactive Dashboard")
@@ -23,59 +23,109 @@ st.title("🌍 Global Economy Indicators — Interactive Dashboard")
 st.info("Using built-in dataset bundled with this app.")
 
 BASE_DIR = Path(__file__).resolve().parent
-T = pd.read_csv(BASE_DIR / "Global Economy Indicators.csv")
+DATA_FILE = BASE_DIR / "Global Economy Indicators.csv"
+
+STAT_NAMES = ['mean', 'std', 'min', 'median', 'max', 'sum']
+EXCHANGE_COLS = ["AMA exchange rate", "IMF based exchange rate"]
 
 # ==========================================================
-#                PART 1 — CLEANING + STATISTICS
+#          CACHED PIPELINE STAGES (reruns only re-render)
 # ==========================================================
 
-st.header("Part 1 — Data Cleaning & Summary Statistics")
+@st.cache_data
+def load_clean_data(path):
+    """Read the CSV, strip column/country names and fill numeric NaN with 0."""
+    T = pd.read_csv(path)
+    T.columns = T.columns.str.strip()
+    T["Country"] = T["Country"].str.strip().str.replace(r"\s+", " ", regex=True)
+
+    numeric_cols = T.select_dtypes(include=[np.number]).columns
+    T[numeric_cols] = T[numeric_cols].fillna(0)
+    return T
+
+
+@st.cache_data
+def column_statistics(T):
+    """Count of non-zero values, mean, std, min, median, max and sum per numeric column."""
+    numeric_columns = T.select_dtypes(include=[np.number])
+    convert = numeric_columns.to_numpy()
+
+    return pd.DataFrame({
+        'Name': numeric_columns.columns,
+        'Count': (convert != 0).sum(axis=0),
+        'Mean': convert.mean(axis=0),
+        'StdDev': convert.std(axis=0, ddof=1),
+        'Min': convert.min(axis=0),
+        'Median': np.median(convert, axis=0),
+        'Max': convert.max(axis=0),
+        'Sum': convert.sum(axis=0)
+    })
+
+
+@st.cache_data
+def country_statistics(T):
+    """Per-country non-zero counts and summary stats for every numeric column in one agg."""
+    numeric_cols = list(T.select_dtypes(include=[np.number]).columns)
+
+    # non-zero indicators become plain columns so counts are just another sum
+    frame = pd.concat(
+        [T[["Country"]], T[numeric_cols].ne(0).add_suffix("_Count"), T[numeric_cols]],
+        axis=1,
+    )
 
-# Clean column names
-T.columns = T.columns.str.strip()
+    named = {f"{c}_Count": (f"{c}_Count", "sum") for c in numeric_cols}
+    named.update({
+        f"{c}_{stat.capitalize()}": (c, stat)
+        for c in numeric_cols for stat in STAT_NAMES
+    })
 
-# Replace NaN with 0 in numeric columns
-for col in T.columns:
-    if pd.api.types.is_numeric_dtype(T[col]):
-        T[col] = T[col].fillna(0)
+    return frame.groupby("Country").agg(**named).reset_index().sort_values("Country")
 
-st.write("### Sample of Cleaned Data")
-st.dataframe(T.head())
 
-# --- Statistics per numeric column ---
-numeric_columns = T.select_dtypes(include=[np.number])
-convert = numeric_columns.to_numpy()
-columns = numeric_columns.columns
-
-Table = pd.DataFrame({
-    'Name': columns,
-    'Count': (convert != 0).sum(axis=0),
-    'Mean': convert.mean(axis=0),
-    'StdDev': convert.std(axis=0, ddof=1),
-    'Min': convert.min(axis=0),
-    'Median': np.median(convert, axis=0),
-    'Max': convert.max(axis=0),
-    'Sum': convert.sum(axis=0)
-})
+@st.cache_data
+def gni_data(T):
+    """Rename GNI, add GNI per capita, and return (data, global GNI per capita, exchange rates)."""
+    data = T.rename(columns={"Gross National Income(GNI) in USD": "GNI"})
+    if not {"GNI", "Population", "Year"}.issubset(data.columns):
+        return data, None, None
 
-st.subheader("📊 Statistics Per Column")
-st.dataframe(Table)
+    data["GNI_per_Capita"] = data["GNI"] / data["Population"]
+
+    global_gni_pc = (
+        data.groupby("Year")["GNI_per_Capita"]
+        .mean()
+        .reset_index()
+        .sort_values("Year")
+    )
+
+    exchange_by_year = None
+    if set(EXCHANGE_COLS).issubset(data.columns):
+        exchange_by_year = (
+            data.groupby("Year")[EXCHANGE_COLS]
+            .mean()
+            .reset_index()
+            .sort_values("Year")
+        )
 
-# --- Statistics per country ---
-grouped = T.groupby("Country")[numeric_columns.columns]
-count_df = grouped.apply(lambda df: (df != 0).sum()).rename(
-    columns=lambda c: f"{c}_Count"
-).reset_index()
+    return data, global_gni_pc, exchange_by_year
 
-agg_df = grouped.agg(['mean', 'std', 'min', 'median', 'max', 'sum'])
-agg_df.columns = [f"{col}_{stat.capitalize()}" for col, stat in agg_df.columns]
-agg_df = agg_df.reset_index()
 
-Table_countries = pd.merge(count_df, agg_df, on="Country", how="outer")
-Table_countries = Table_countries.sort_values("Country")
+T = load_clean_data(DATA_FILE)
+
+# ==========================================================
+#                PART 1 — CLEANING + STATISTICS
+# ==========================================================
+
+st.header("Part 1 — Data Cleaning & Summary Statistics")
+
+st.write("### Sample of Cleaned Data")
+st.dataframe(T.head())
+
+st.subheader("📊 Statistics Per Column")
+st.dataframe(column_statistics(T))
 
 st.subheader("📊 Statistics Per Country")
-st.dataframe(Table_countries)
+st.dataframe(country_statistics(T))
 
 # ==========================================================
 #                PART 2 — GNI & EXCHANGE RATES
@@ -83,27 +133,14 @@ st.dataframe(Table_countries)
 
 st.header("Part 2 — Global Trends (GNI Per Capita & Exchange Rates)")
 
-data = T.copy()
-
-# Rename GNI column
-if "Gross National Income(GNI) in USD" in data.columns:
-    data.rename(columns={"Gross National Income(GNI) in USD": "GNI"}, inplace=True)
+data, global_gni_pc, exchange_by_year = gni_data(T)
 
 # --- Verify required columns ---
 required_cols = {"GNI", "Population", "Year"}
-if not required_cols.issubset(data.columns):
+if global_gni_pc is None:
     st.error(f"Missing columns: {required_cols}")
     st.stop()
 
-data["GNI_per_Capita"] = data["GNI"] / data["Population"]
-
-global_gni_pc = (
-    data.groupby("Year")["GNI_per_Capita"]
-    .mean()
-    .reset_index()
-    .sort_values("Year")
-)
-
 st.subheader("🌐 Global Average GNI per Capita Over Time")
 
 fig, ax = plt.subplots(figsize=(10, 5))
@@ -114,16 +151,7 @@ ax.grid(True)
 st.pyplot(fig)
 
 # --- Exchange rates ---
-required_exCols = {"AMA exchange rate", "IMF based exchange rate"}
-
-if required_exCols.issubset(data.columns):
-    exchange_by_year = (
-        data.groupby("Year")[list(required_exCols)]
-        .mean()
-        .reset_index()
-        .sort_values("Year")
-    )
-
+if exchange_by_year is not None:
     st.subheader("💱 Average Exchange Rates Over Time")
 
     fig, ax = plt.subplots(figsize=(10, 5))
@@ -142,60 +170,69 @@ else:
 #                      PART 3 — CONTINENTS & GNI CHANGE
 # ==========================================================
 
-st.header("Part 3 — Continent Trends (5-Year Intervals)")
-
-data["Country"] = data["Country"].str.strip()
-data["Country"] = data["Country"].str.replace(r"\s+", " ", regex=True)
-
-def country_to_continent(country_name):
-    if pc is None:
-        return "Other"
-    try:
-        alpha = pc.country_name_to_country_alpha2(country_name)
-        cont = pc.country_alpha2_to_continent_code(alpha)
-        mapping = {
-            'AF': 'Africa', 'AS': 'Asia', 'EU': 'Europe',
-            'NA': 'North America', 'OC': 'Oceania', 'SA': 'South America'
-        }
-        return mapping.get(cont, "Other")
-    except:
-        return "Other"
-
-data["Continent"] = data["Country"].apply(country_to_continent)
-data["Interval"] = (data["Year"] // 5) * 5
-
-gni_intervals = (
-    data.groupby(["Country", "Continent", "Interval"])["GNI"]
-    .mean()
-    .reset_index()
-)
+st.header("Part 3 — Continent Trends by Interval")
 
-gni_intervals["GNI_change"] = gni_intervals.groupby("Country")["GNI"].diff()
+INTERVAL_WIDTHS = [1, 5, 10]
 
-continent_trends = (
-    gni_intervals.groupby(["Continent", "Interval"])[["GNI", "GNI_change"]]
-    .mean()
-    .reset_index()
-)
+@st.cache_data
+def continent_lookup(path):
+    """Precomputed country -> continent table (see country_continents.py)."""
+    return load_continent_map(path)
+
+
+def countries_to_continents(countries):
+    """Map countries to continents once per unique name via a categorical."""
+    continent_map = continent_lookup(MAPPING_FILE)
+    return (
+        countries.astype("category")
+        .map(lambda c: continent_map.get(c, "Other"))
+        .astype(str)
+    )
+
+
+@st.cache_data
+def country_year_gni(data):
+    """GNI sum and row count per country and year, tagged with the continent."""
+    yearly = (
+        data.groupby(["Country", "Year"])["GNI"]
+        .agg(["sum", "count"])
+        .reset_index()
+    )
+    yearly["Continent"] = countries_to_continents(yearly["Country"])
+    return yearly
+
+
+@st.cache_data
+def continent_intervals(yearly, width):
+    """Interval x continent matrix of mean per-country GNI change between intervals.
+
+    Interval means are rebuilt from the cached yearly sums and counts, so
+    changing the width never goes back to the row-level data.
+    """
+    yearly = yearly.assign(Interval=(yearly["Year"] // width) * width)
+    gni_intervals = yearly.groupby(["Country", "Continent", "Interval"])[["sum", "count"]].sum()
+    gni_intervals["GNI"] = gni_intervals["sum"] / gni_intervals["count"]
+    gni_intervals["GNI_change"] = gni_intervals.groupby(level="Country")["GNI"].diff()
+
+    return gni_intervals.pivot_table(
+        index="Interval", columns="Continent", values="GNI_change", aggfunc="mean"
+    )
+
+width = st.select_slider("Interval width (years)", options=INTERVAL_WIDTHS, value=5)
+gni_change = continent_intervals(country_year_gni(data), width)
 
 # -------- BAR CHART --------
-st.subheader("📉 GNI Change Across Continents (5-Year Intervals)")
+st.subheader(f"📉 GNI Change Across Continents ({width}-Year Intervals)")
 
-intervals = sorted(continent_trends["Interval"].unique())
-continents = continent_trends["Continent"].unique()
-bar_width = 0.12
+intervals = gni_change.index
+continents = gni_change.columns
+bar_width = 0.8 / len(continents)
 x = np.arange(len(intervals))
 
 fig, ax = plt.subplots(figsize=(12, 6))
 
 for i, cont in enumerate(continents):
-    subset = continent_trends[continent_trends["Continent"] == cont]
-    y = [
-        subset.loc[subset["Interval"] == interval, "GNI_change"].values[0]
-        if interval in subset["Interval"].values else 0
-        for interval in intervals
-    ]
-    ax.bar(x + i*bar_width, y, width=bar_width, label=cont)
+    ax.bar(x + i*bar_width, gni_change[cont].fillna(0), width=bar_width, label=cont)
 
 ax.set_xticks(x + bar_width * (len(continents)-1) / 2)
 ax.set_xticklabels(intervals, rotation=45)
@@ -212,14 +249,130 @@ st.subheader("📈 GNI Change Line Plot")
 fig, ax = plt.subplots(figsize=(12, 6))
 
 for cont in continents:
-    subset = continent_trends[continent_trends["Continent"] == cont]
-    ax.plot(subset["Interval"], subset["GNI_change"], marker="o", label=cont)
+    series = gni_change[cont].dropna()
+    ax.plot(series.index, series, marker="o", label=cont)
 
-ax.set_xlabel("5-Year Interval")
+ax.set_xlabel(f"{width}-Year Interval")
 ax.set_ylabel("GNI Change (USD)")
 ax.legend()
 ax.grid(True)
 
 st.pyplot(fig)
 
+# ==========================================================
+#                PART 4 — INDICATOR EXPLORER
+# ==========================================================
+
+st.header("Part 4 — Indicator Explorer")
+
+EXPLORER_VARIANTS = {
+    "Level": "level",
+    "Year-over-year growth (%)": "growth",
+    "Per capita": "per_capita",
+}
+EXPLORER_DEFAULT_COUNTRIES = ["United States", "China", "India", "Germany"]
+
+
+def continent_means(values, membership):
+    """Mean over each continent's reporting countries: (country, ...) -> (continent, ...)."""
+    present = ~np.isnan(values)
+    totals = np.tensordot(membership, np.where(present, values, 0), axes=1)
+    counts = np.tensordot(membership, present.astype(float), axes=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return totals / counts
+
+
+@st.cache_resource
+def indicator_cube(path):
+    """Dense country x year x indicator arrays, built once and shared by every session.
+
+    Zeros written by the cleaning step are treated as missing. Each variant
+    (level, year-over-year growth, per capita) is kept for countries and as
+    continent means, so the explorer only slices arrays.
+    """
+    T = load_clean_data(path)
+    indicators = [
+        c for c in T.select_dtypes(include=[np.number]).columns
+        if c not in ("CountryID", "Year")
+    ]
+    countries, country_idx = np.unique(T["Country"].to_numpy(), return_inverse=True)
+    years = np.arange(T["Year"].min(), T["Year"].max() + 1)
+
+    values = T[indicators].to_numpy(dtype=float)
+    level = np.full((len(countries), len(years), len(indicators)), np.nan)
+    level[country_idx, T["Year"].to_numpy() - years[0]] = np.where(values == 0, np.nan, values)
+
+    growth = np.full_like(level, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth[:, 1:] = (level[:, 1:] / level[:, :-1] - 1) * 100
+        per_capita = level / level[:, :, [indicators.index("Population")]]
+
+    continent_of = countries_to_continents(pd.Series(countries)).to_numpy()
+    continents, continent_idx = np.unique(continent_of, return_inverse=True)
+    membership = np.zeros((len(continents), len(countries)))
+    membership[continent_idx, np.arange(len(countries))] = 1
+
+    country = {"level": level, "growth": growth, "per_capita": per_capita}
+    return {
+        "countries": countries,
+        "continents": continents,
+        "years": years,
+        "indicators": indicators,
+        "country": country,
+        "continent": {k: continent_means(v, membership) for k, v in country.items()},
+    }
+
+
+cube = indicator_cube(DATA_FILE)
+years = cube["years"]
+
+col1, col2 = st.columns(2)
+indicator = col1.selectbox(
+    "Indicator",
+    cube["indicators"],
+    index=cube["indicators"].index("Gross National Income(GNI) in USD"),
+)
+variant = EXPLORER_VARIANTS[col2.radio("Values", list(EXPLORER_VARIANTS), horizontal=True)]
+
+selected_countries = st.multiselect(
+    "Countries",
+    cube["countries"],
+    default=[c for c in EXPLORER_DEFAULT_COUNTRIES if c in cube["countries"]],
+)
+selected_continents = st.multiselect("Continent averages", cube["continents"])
+first_year, last_year = st.slider(
+    "Years",
+    int(years[0]), int(years[-1]),
+    (int(years[0]), int(years[-1])),
+)
+
+# every series below is a slice of the cached cube
+k = cube["indicators"].index(indicator)
+span = slice(first_year - years[0], last_year - years[0] + 1)
+country_rows = np.searchsorted(cube["countries"], selected_countries)
+continent_rows = np.searchsorted(cube["continents"], selected_continents)
+
+series = pd.DataFrame(
+    np.vstack([
+        cube["country"][variant][country_rows, span, k],
+        cube["continent"][variant][continent_rows, span, k],
+    ]).T,
+    index=years[span],
+    columns=list(selected_countries) + [f"{c} (avg)" for c in selected_continents],
+)
+
+if series.empty:
+    st.info("Pick at least one country or continent to plot.")
+else:
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for name in series.columns:
+        ax.plot(series.index, series[name], marker=".", label=name)
+    ax.set_xlabel("Year")
+    ax.set_ylabel(indicator)
+    ax.legend()
+    ax.grid(True)
+    st.pyplot(fig)
+
+    st.dataframe(series)
+
 st.success("Dashboard generated successfully!")
@@ -0,0 +1,117 @@
+"""Country -> ISO2 -> continent lookup table for the Global Economy dataset.
+
+The table is built offline (optionally with pycountry_convert) and shipped as a
+versioned CSV, so the app does not need pycountry_convert at runtime.
+
+Rebuild after the dataset's country list changes (bump MAPPING_VERSION):
+    python country_continents.py
+"""
+
+import csv
+import re
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_FILE = BASE_DIR / "Global Economy Indicators.csv"
+
+MAPPING_VERSION = 1
+MAPPING_FILE = BASE_DIR / f"country_continents_v{MAPPING_VERSION}.csv"
+
+CONTINENT_NAMES = {
+    'AF': 'Africa', 'AS': 'Asia', 'EU': 'Europe',
+    'NA': 'North America', 'OC': 'Oceania', 'SA': 'South America'
+}
+
+# Dataset names pycountry cannot resolve: (ISO2, continent code).
+# Former states use their ISO 3166-3 transitional codes.
+MANUAL_OVERRIDES = {
+    "Bolivia (Plurinational State of)": ("BO", "SA"),
+    "China, Hong Kong SAR": ("HK", "AS"),
+    "China, Macao SAR": ("MO", "AS"),
+    "Czechoslovakia (Former)": ("CS", "EU"),
+    "D.P.R. of Korea": ("KP", "AS"),
+    "D.R. of the Congo": ("CD", "AF"),
+    "Ethiopia (Former)": ("ET", "AF"),
+    "Former Netherlands Antilles": ("AN", "NA"),
+    "Iran (Islamic Republic of)": ("IR", "AS"),
+    "Kosovo": ("XK", "EU"),
+    "Lao People's DR": ("LA", "AS"),
+    "Micronesia (FS of)": ("FM", "OC"),
+    "Republic of Korea": ("KR", "AS"),
+    "Sint Maarten (Dutch part)": ("SX", "NA"),
+    "St. Vincent and the Grenadines": ("VC", "NA"),
+    "State of Palestine": ("PS", "AS"),
+    "Sudan (Former)": ("SD", "AF"),
+    "Timor-Leste": ("TL", "AS"),
+    "U.R. of Tanzania: Mainland": ("TZ", "AF"),
+    "USSR (Former)": ("SU", "EU"),
+    "Venezuela (Bolivarian Republic of)": ("VE", "SA"),
+    "Yemen Arab Republic (Former)": ("YE", "AS"),
+    "Yemen Democratic (Former)": ("YE", "AS"),
+    "Yugoslavia (Former)": ("YU", "EU"),
+    "Zanzibar": ("TZ", "AF"),
+}
+
+
+def normalize_country(name):
+    """Strip and collapse whitespace, matching the app's cleaning step."""
+    return re.sub(r"\s+", " ", name.strip())
+
+
+def _resolve(country, pc):
+    """Return (iso2, continent code, source) for one country name."""
+    if country in MANUAL_OVERRIDES:
+        iso2, code = MANUAL_OVERRIDES[country]
+        return iso2, code, "override"
+    if pc is None:
+        return "", "", "unresolved"
+    try:
+        iso2 = pc.country_name_to_country_alpha2(country)
+        return iso2, pc.country_alpha2_to_continent_code(iso2), "pycountry"
+    except (KeyError, ValueError):
+        return "", "", "unresolved"
+
+
+def build_mapping(countries, path=MAPPING_FILE):
+    """Resolve every country once and write the lookup table CSV."""
+    try:
+        import pycountry_convert as pc
+    except ModuleNotFoundError:
+        pc = None
+
+    rows = []
+    for country in sorted(set(countries)):
+        iso2, code, source = _resolve(country, pc)
+        rows.append({
+            "country": country,
+            "iso2": iso2,
+            "continent": CONTINENT_NAMES.get(code, "Other"),
+            "source": source,
+        })
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["country", "iso2", "continent", "source"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    return rows
+
+
+def load_continent_map(path=MAPPING_FILE):
+    """Read the lookup table as a {country: continent} dict."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["country"]: row["continent"] for row in csv.DictReader(f)}
+
+
+if __name__ == "__main__":
+    with open(DATA_FILE, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        country_idx = header.index("Country")
+        countries = {normalize_country(row[country_idx]) for row in reader}
+
+    rows = build_mapping(countries)
+    unresolved = [r["country"] for r in rows if r["source"] == "unresolved"]
+    print(f"Wrote {len(rows)} countries to {MAPPING_FILE.name}")
+    if unresolved:
+        print("Unresolved (add to MANUAL_OVERRIDES):", ", ".join(unresolved))
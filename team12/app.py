@@ -6,7 +6,13 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent
 sys.path.append(str(BASE_DIR))
 from climate_disasters_pipeline import (
-    build_merged_dataset,
+    SOURCES,
+    available_sources,
+    load_source,
+    merge_sources,
+    disaster_count_cube,
+    lagged_correlations,
+    strongest_correlations,
     compute_disaster_summary,
     disaster_type_counts,
 )
@@ -29,9 +35,54 @@ if os.path.basename(BASE_PATH).lower() == "data cleaning code":
     BASE_PATH = os.path.dirname(BASE_PATH)
 
 # --------------------------------------------------------------------
-# Load data
+# Load data (each source cached on its own, so adding one reuses the rest)
 # --------------------------------------------------------------------
-disasters_per_year, merged, disasters_all = build_merged_dataset(BASE_PATH)
+@st.cache_data
+def cached_source(base_path, name):
+    return load_source(base_path, name)
+
+
+@st.cache_data
+def cached_merge(base_path, sources):
+    return merge_sources({name: cached_source(base_path, name) for name in sources})
+
+
+@st.cache_data
+def cached_cube(base_path, sources):
+    return disaster_count_cube(cached_merge(base_path, sources)["disasters"])
+
+
+@st.cache_data
+def cached_correlations(base_path, sources, max_lag, differenced):
+    result = cached_merge(base_path, sources)
+    cube = cached_cube(base_path, sources)
+    temperature = result["annual"].set_index("year")["temperature"]
+    return strongest_correlations(
+        lagged_correlations(cube, temperature, max_lag, differenced), cube
+    )
+
+
+available = available_sources(BASE_PATH)
+selected = st.multiselect(
+    "Data sources",
+    available,
+    default=available,
+    format_func=lambda name: f"{name} ({SOURCES[name]['kind']})",
+)
+if not selected:
+    st.warning("Select at least one data source.")
+    st.stop()
+
+result = cached_merge(BASE_PATH, tuple(selected))
+merged, disasters_all = result["annual"], result["disasters"]
+repaired = result["dates_repaired"]
+st.caption(
+    "Two-digit-year dates assigned to a different century than pandas' default: "
+    + ", ".join(f"{name} {count}" for name, count in repaired.items())
+)
+missing = [name for name in SOURCES if name not in available]
+if missing:
+    st.caption("Source files not found: " + ", ".join(missing))
 
 # Safety filter on year range
 merged = merged[(merged["year"] >= 1970) & (merged["year"] <= 2022)]
@@ -90,5 +141,24 @@ if temp_col is not None:
 else:
     st.write("Temperature column not found in merged dataset.")
 
+# --------------------------------------------------------------------
+# LAGGED TEMPERATURE CORRELATION BY REGION AND TYPE
+# --------------------------------------------------------------------
+st.subheader("Temperature vs. Disasters by Region and Type (Lagged)")
+
+if "temperature" not in result["annual"].columns or disasters_all.empty:
+    st.write("Select at least one temperature and one disaster source.")
+else:
+    col1, col2, col3 = st.columns(3)
+    max_lag = col1.slider("Maximum lag (years)", 0, 10, 5)
+    min_events = col2.slider("Minimum events per series", 1, 100, 10)
+    differenced = col3.checkbox("Use year-over-year changes", value=True)
 
+    strongest = cached_correlations(BASE_PATH, tuple(selected), max_lag, differenced)
+    strongest = strongest[strongest["events"] >= min_events]
 
+    st.caption(
+        "Each row is the lag (temperature leading disasters) with the largest "
+        "absolute correlation for one region/type series. Click a column to sort."
+    )
+    st.dataframe(strongest, hide_index=True, use_container_width=True)
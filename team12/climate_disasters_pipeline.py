@@ -10,8 +10,9 @@ This module provides functions to:
 - Aggregate to annual level
 - Merge temperature + disaster counts
 - Compute summary statistics and type frequencies
+- Build a region × disaster-type count cube and its lagged temperature correlations
 
-Files expected (in base_path or Kaggle input path):
+Files (in base_path or Kaggle input path); any subset may be present:
 - Gia_Bch_Nguyn_Earth_Temps_Cleaned.csv
 - Berkeley_Earth_Temps_Cleaned.csv
 - Josep_Ferrer_Temps_Cleaned.csv
@@ -20,45 +21,109 @@ Files expected (in base_path or Kaggle input path):
 """
 
 # climate_disasters_pipeline.py
-# Minimal disasters-only pipeline for ENG 220 Streamlit app
+# Multi-source climate/disasters pipeline for ENG 220 Streamlit app
 
 import os
+import numpy as np
 import pandas as pd
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional
 from pathlib import Path
 
+# Both cleaned files write dates as "30-Jun-12"
+DATE_FORMAT = "%d-%b-%y"
+# Latest year covered by the data; two-digit years resolve to the 100 years ending here
+DEFAULT_PIVOT_YEAR = 2022
+
 # ---------------------------------------------------------------------
-# LOAD DISASTER DATA (Var5 = true disaster type)
+# DATE NORMALIZATION (two-digit years)
 # ---------------------------------------------------------------------
+def normalize_dates(
+    values: pd.Series, pivot_year: int = DEFAULT_PIVOT_YEAR, ordered: bool = False
+) -> Tuple[pd.Series, int]:
+    """Parse dd-Mon-yy strings with a fixed format and a pivot-year century rule.
 
-def load_disaster_data(base_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Load cleaned disaster dataset and compute counts per year."""
-    base_path = Path(base_path)
+    ``%y`` alone maps 00-68 to 20xx and 69-99 to 19xx, so ``1-Jul-29`` would
+    become 2029. Here each two-digit year is placed in the 100 years ending at
+    ``pivot_year``. With ``ordered=True`` (a chronologically sorted series
+    spanning more than a century) the last row follows the pivot rule and every
+    backwards wrap of the two-digit year moves one century earlier.
 
-    dis_path = base_path / "Baris_Dincer_Disasters_Cleaned.csv"
+    Returns the parsed dates and the number of rows whose century was changed.
+    """
+    parsed = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+    valid = parsed.notna().to_numpy()
+    parsed_year = parsed.dt.year.to_numpy()[valid].astype(int)
+    yy = parsed_year % 100
 
-    df = pd.read_csv(dis_path)
+    if ordered and len(yy):
+        wraps = np.concatenate([[0], np.cumsum(np.diff(yy) < 0)])
+        last_year = pivot_year - (pivot_year - yy[-1]) % 100
+        year = yy + (last_year - yy[-1]) - (wraps[-1] - wraps) * 100
+    else:
+        year = pivot_year - (pivot_year - yy) % 100
 
-    df.columns = ["event_date", "region", "category", "subcategory", "disaster_type"]
-    df["disaster_type"] = df["disaster_type"].astype(str).str.strip()
-    df["event_date"] = pd.to_datetime(df["event_date"], errors="coerce")
-    df = df.dropna(subset=["event_date"])
-    df["year"] = df["event_date"].dt.year.astype(int)
-    df = df[(df["year"] >= 1970) & (df["year"] <= 2022)]
+    repaired = year != parsed_year
+    dates = parsed.copy()
+    if repaired.any():
+        valid_dates = parsed[valid]
+        dates[valid] = pd.to_datetime(
+            pd.DataFrame({
+                "year": year,
+                "month": valid_dates.dt.month.to_numpy(),
+                "day": valid_dates.dt.day.to_numpy(),
+            }),
+            errors="coerce",
+        ).to_numpy()
 
-    disasters_per_year = df.groupby("year").size().reset_index(name="disaster_count")
-    return df, disasters_per_year
+    return dates, int(repaired.sum())
 
 
 # ---------------------------------------------------------------------
-# LOAD TEMPERATURE DATA (monthly → annual averages)
+# SOURCES
 # ---------------------------------------------------------------------
-def load_temperature_data(base_path: str) -> pd.DataFrame:
+# Every cleaned file the project produced. Disaster files share the cleaned
+# EventDate, Region, Type, Subtype, Subsubtype layout; "ordered" marks a
+# sorted monthly series whose two-digit years span more than a century.
+SOURCES = {
+    "Gia": {"kind": "temperature", "file": "Gia_Bch_Nguyn_Earth_Temps_Cleaned.csv"},
+    "Berkeley": {"kind": "temperature", "file": "Berkeley_Earth_Temps_Cleaned.csv", "ordered": True},
+    "Josep": {"kind": "temperature", "file": "Josep_Ferrer_Temps_Cleaned.csv"},
+    "Baris": {"kind": "disaster", "file": "Baris_Dincer_Disasters_Cleaned.csv"},
+    "Shreyansh": {"kind": "disaster", "file": "Shreyansh_Dangi_Disasters_Cleaned.csv"},
+}
+
+DISASTER_COLUMNS = ["event_date", "region", "category", "subcategory", "disaster_type"]
+YEAR_RANGE = (1970, 2022)
+
+
+def available_sources(base_path: str) -> List[str]:
+    """Names of the sources whose cleaned file is present under base_path."""
     base_path = Path(base_path)
+    return [name for name, spec in SOURCES.items() if (base_path / spec["file"]).exists()]
 
-    temps_path = base_path / "Berkeley_Earth_Temps_Cleaned.csv"
 
-    temps = pd.read_csv(temps_path)
+# ---------------------------------------------------------------------
+# LOAD ONE SOURCE
+# ---------------------------------------------------------------------
+def _read_disasters(path: Path, pivot_year: int) -> pd.DataFrame:
+    """Disaster events (Var5 = true disaster type) inside YEAR_RANGE."""
+    df = pd.read_csv(path).iloc[:, :len(DISASTER_COLUMNS)]
+
+    df.columns = DISASTER_COLUMNS
+    df["disaster_type"] = df["disaster_type"].astype(str).str.strip()
+    df["event_date"], repaired = normalize_dates(df["event_date"], pivot_year)
+    df = df.dropna(subset=["event_date"])
+    df["year"] = df["event_date"].dt.year.astype(int)
+    df["month"] = df["event_date"].dt.month.astype(int)
+    df = df[(df["year"] >= YEAR_RANGE[0]) & (df["year"] <= YEAR_RANGE[1])]
+
+    df.attrs["dates_repaired"] = repaired
+    return df
+
+
+def _read_temperatures(path: Path, pivot_year: int, ordered: bool) -> pd.DataFrame:
+    """Monthly temperature readings with dt, year, month and temperature columns."""
+    temps = pd.read_csv(path)
 
     cols = list(temps.columns)
 
@@ -76,13 +141,57 @@ def load_temperature_data(base_path: str) -> pd.DataFrame:
         temp_col = cols[1]
 
     temps = temps.rename(columns={date_col: "dt", temp_col: "temperature"})
-    temps["dt"] = pd.to_datetime(temps["dt"], errors="coerce", dayfirst=True)
+    temps["dt"], repaired = normalize_dates(temps["dt"], pivot_year, ordered=ordered)
     temps = temps.dropna(subset=["dt"])
     temps["year"] = temps["dt"].dt.year
+    temps["month"] = temps["dt"].dt.month
+
+    temps = temps[["dt", "year", "month", "temperature"]]
+    temps.attrs["dates_repaired"] = repaired
+    return temps
+
+
+def load_source(base_path: str, name: str, pivot_year: int = DEFAULT_PIVOT_YEAR) -> pd.DataFrame:
+    """Load and standardize one entry of SOURCES, tagging rows with its name.
+
+    Sources are independent of each other, so callers can memoize this per
+    name. The repaired date count is kept in ``attrs["dates_repaired"]``.
+    """
+    spec = SOURCES[name]
+    path = Path(base_path) / spec["file"]
+
+    if spec["kind"] == "disaster":
+        df = _read_disasters(path, pivot_year)
+    else:
+        df = _read_temperatures(path, pivot_year, spec.get("ordered", False))
+
+    df = df.assign(source=name)
+    return df
+
+
+# ---------------------------------------------------------------------
+# LOAD DISASTER DATA
+# ---------------------------------------------------------------------
+def load_disaster_data(
+    base_path: str, pivot_year: int = DEFAULT_PIVOT_YEAR
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Load the Baris Dincer disaster dataset and compute counts per year."""
+    df = load_source(base_path, "Baris", pivot_year)
+    disasters_per_year = df.groupby("year").size().reset_index(name="disaster_count")
+    return df, disasters_per_year
+
+
+# ---------------------------------------------------------------------
+# LOAD TEMPERATURE DATA (monthly → annual averages)
+# ---------------------------------------------------------------------
+def load_temperature_data(base_path: str, pivot_year: int = DEFAULT_PIVOT_YEAR) -> pd.DataFrame:
+    """Load the Berkeley Earth monthly series and average it per year."""
+    temps = load_source(base_path, "Berkeley", pivot_year)
 
     temps_annual = (
         temps.groupby("year", as_index=False)["temperature"].mean().sort_values("year")
     )
+    temps_annual.attrs["dates_repaired"] = temps.attrs["dates_repaired"]
 
     return temps_annual
 
@@ -90,12 +199,68 @@ def load_temperature_data(base_path: str) -> pd.DataFrame:
 # ---------------------------------------------------------------------
 # MERGE DATASETS
 # ---------------------------------------------------------------------
-def build_merged_dataset(base_path: str):
-    disasters_all, disasters_per_year = load_disaster_data(base_path)
-    temps_annual = load_temperature_data(base_path)
+def combine_disasters(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Stack disaster sources, keeping each event only from the first source reporting it.
 
-    merged = pd.merge(temps_annual, disasters_per_year, on="year", how="left")
-    merged["disaster_count"] = merged["disaster_count"].fillna(0).astype(int)
+    Events match across sources on date, region and disaster type; repeats
+    within a single source are left alone.
+    """
+    if not frames:
+        return pd.DataFrame(columns=DISASTER_COLUMNS + ["year", "month", "source"])
+
+    events = pd.concat(frames, ignore_index=True)
+    key = [
+        events["event_date"],
+        events["region"].astype(str).str.strip().str.lower(),
+        events["disaster_type"].str.lower(),
+    ]
+    first_source = events.groupby(key, sort=False)["source"].transform("first")
+    return events[events["source"] == first_source].reset_index(drop=True)
+
+
+def merge_sources(frames: Dict[str, pd.DataFrame]) -> Dict[str, object]:
+    """Harmonize loaded sources (name -> load_source frame) to annual and monthly frames.
+
+    Each temperature source becomes a ``temperature_<name>`` column and the
+    first one selected is also exposed as ``temperature``. Disaster counts come
+    from the deduplicated events. With temperature sources present, periods
+    follow their coverage (as the original left merge did).
+    """
+    temps = {n: f for n, f in frames.items() if SOURCES[n]["kind"] == "temperature"}
+    events = combine_disasters(
+        [f for n, f in frames.items() if SOURCES[n]["kind"] == "disaster"]
+    )
+
+    result = {"disasters": events}
+    for period, keys in (("annual", ["year"]), ("monthly", ["year", "month"])):
+        counts = events.groupby(keys).size().rename("disaster_count")
+        if temps:
+            merged = pd.concat(
+                {f"temperature_{n}": f.groupby(keys)["temperature"].mean() for n, f in temps.items()},
+                axis=1,
+            )
+            merged["temperature"] = merged[f"temperature_{next(iter(temps))}"]
+            merged = merged.join(counts, how="left")
+        else:
+            merged = counts.to_frame()
+        merged["disaster_count"] = merged["disaster_count"].fillna(0).astype(int)
+        result[period] = merged.sort_index().reset_index()
+
+    result["dates_repaired"] = {n: f.attrs.get("dates_repaired", 0) for n, f in frames.items()}
+    return result
+
+
+def build_merged_dataset(base_path: str, sources: Optional[List[str]] = None):
+    """Merge the given sources (default: every available one) into annual data."""
+    if sources is None:
+        sources = available_sources(base_path)
+    frames = {name: load_source(base_path, name) for name in sources}
+    result = merge_sources(frames)
+
+    disasters_all = result["disasters"]
+    disasters_per_year = disasters_all.groupby("year").size().reset_index(name="disaster_count")
+    merged = result["annual"]
+    merged.attrs["dates_repaired"] = result["dates_repaired"]
 
     return disasters_per_year, merged, disasters_all
 
@@ -121,3 +286,80 @@ def compute_disaster_summary(merged_df: pd.DataFrame) -> Dict[str, float]:
 def disaster_type_counts(df: pd.DataFrame) -> pd.Series:
     return df["disaster_type"].value_counts()
 
+
+
+# ---------------------------------------------------------------------
+# REGION × TYPE COUNT CUBE
+# ---------------------------------------------------------------------
+ALL_TYPES = "All types"
+ALL_REGIONS = "All regions"
+
+
+def disaster_count_cube(events: pd.DataFrame) -> pd.DataFrame:
+    """Disaster counts per (region, disaster_type) series and year.
+
+    Besides every region × type pair, each region gets an ALL_TYPES row and
+    each type an ALL_REGIONS row. Columns run over every year from the first
+    to the last event, with zeros for years without events.
+    """
+    base = events.groupby(["region", "disaster_type", "year"]).size().unstack("year", fill_value=0)
+
+    by_region = base.groupby(level="region").sum()
+    by_region.index = pd.MultiIndex.from_product([by_region.index, [ALL_TYPES]])
+    by_type = base.groupby(level="disaster_type").sum()
+    by_type.index = pd.MultiIndex.from_product([[ALL_REGIONS], by_type.index])
+
+    cube = pd.concat([base, by_region, by_type])
+    cube.index.names = ["region", "disaster_type"]
+    years = np.arange(cube.columns.min(), cube.columns.max() + 1)
+    return cube.reindex(columns=years, fill_value=0)
+
+
+def lagged_correlations(
+    cube: pd.DataFrame, temperature: pd.Series, max_lag: int = 5, differenced: bool = False
+) -> pd.DataFrame:
+    """Pearson correlation of every cube series with temperature ``lag`` years earlier.
+
+    ``temperature`` is indexed by year. For each lag, all series are correlated
+    at once as one centered matrix-vector product over the years where the
+    lagged temperature exists. With ``differenced`` both sides are turned into
+    year-over-year changes first, which removes the shared upward trend.
+    Returns one row per series and lag.
+    """
+    values = cube.to_numpy(dtype=float)
+    years = np.asarray(cube.columns)
+    temperature = temperature.reindex(np.arange(years[0] - max_lag - 1, years[-1] + 1))
+    if differenced:
+        values = np.diff(values, axis=1)
+        years = years[1:]
+        temperature = temperature.diff()
+
+    frames = []
+    for lag in range(max_lag + 1):
+        temps = temperature.reindex(years - lag).to_numpy()
+        keep = ~np.isnan(temps)
+        if keep.sum() < 3:
+            continue
+
+        x = values[:, keep] - values[:, keep].mean(axis=1, keepdims=True)
+        t = temps[keep] - temps[keep].mean()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = (x @ t) / (np.sqrt((x ** 2).sum(axis=1)) * np.sqrt((t ** 2).sum()))
+
+        frames.append(pd.DataFrame(
+            {"lag": lag, "correlation": r, "years": int(keep.sum())}, index=cube.index
+        ))
+
+    if not frames:
+        return pd.DataFrame(columns=["region", "disaster_type", "lag", "correlation", "years"])
+    return pd.concat(frames).reset_index()
+
+
+def strongest_correlations(correlations: pd.DataFrame, cube: pd.DataFrame) -> pd.DataFrame:
+    """Best lag per series, with its event total, sorted by absolute correlation."""
+    table = correlations.dropna(subset=["correlation"])
+    best = table.loc[table["correlation"].abs().groupby([table["region"], table["disaster_type"]]).idxmax()]
+
+    totals = cube.sum(axis=1).rename("events")
+    best = best.join(totals, on=["region", "disaster_type"])
+    return best.sort_values("correlation", key=np.abs, ascending=False).reset_index(drop=True)
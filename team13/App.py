@@ -2,27 +2,80 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import pydeck as pdk
+import sys
 from pathlib import Path
 
 st.set_page_config(page_title="California Housing Comparison", layout="wide")
 BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+from build_housing_data import load_cleaned
+from spatial_matching import block_changes
+from house_value_model import (
+   load_or_train, features_updated, predict, coefficient_names
+)
+from housing_raster import (
+   CA_EXTENT, rasterize, layer_grid, difference_grid, color_limits, grid_to_png_url
+)
 
 @st.cache_data
 def load_data():
-   cl_data_1990 = pd.read_csv(BASE_DIR / "cleaned_california_housing_1990.csv")
-   cl_data_updated = pd.read_csv(BASE_DIR / "cleaned_california_housing_updated.csv")
+   cl_data_1990 = load_cleaned("1990")
+   cl_data_updated = load_cleaned("updated")
    return cl_data_1990, cl_data_updated
 
 cl_data_1990, cl_data_updated = load_data()
 
+AGE_COLUMNS = {"1990": "housing_median_age", "updated": "average_house_age"}
+
+
+def sorted_index(keys, values=None):
+   """Sorted keys plus prefix sums of values, so any binning is O(bins log n)."""
+   order = np.argsort(keys, kind="stable")
+   index = {"keys": keys[order]}
+   if values is not None:
+      index["cumsum"] = np.concatenate([[0.0], np.cumsum(values[order])])
+   return index
+
+
+def bin_counts(index, edges):
+   """Number of keys in each [edge_i, edge_i+1) bin."""
+   return np.diff(np.searchsorted(index["keys"], edges, side="left"))
+
+
+def bin_means(index, edges):
+   """Mean value of the keys in each [edge_i, edge_i+1) bin (NaN if empty)."""
+   pos = np.searchsorted(index["keys"], edges, side="left")
+   with np.errstate(divide="ignore", invalid="ignore"):
+      return np.diff(index["cumsum"][pos]) / np.diff(pos)
+
+
+@st.cache_data
+def comparison_aggregates():
+   """Every 1990 vs updated aggregate the page needs, computed once."""
+   aggregates = {}
+   for name, df in zip(["1990", "updated"], load_data()):
+      age = df[[AGE_COLUMNS[name], "median_house_value"]].dropna()
+      aggregates[name] = {
+         "describe": df.describe(include="all"),
+         # one groupby gives both the pie counts and the per-category means
+         "proximity": df.groupby("ocean_proximity", dropna=False)["median_house_value"].agg(["size", "mean"]),
+         "age_index": sorted_index(age.iloc[:, 0].to_numpy(), age.iloc[:, 1].to_numpy()),
+         "value_index": sorted_index(df["median_house_value"].dropna().to_numpy()),
+      }
+   return aggregates
+
+aggregates = comparison_aggregates()
+agg_1990, agg_updated = aggregates["1990"], aggregates["updated"]
+
 st.title("California Housing: 1990 vs Updated Data")
 
 st.subheader("Dataset Summaries")
 with st.expander("Show summary for 1990 data"):
-    st.write(cl_data_1990.describe(include="all"))
+    st.write(agg_1990["describe"])
 
 with st.expander("Show summary for updated data"):
-    st.write(cl_data_updated.describe(include="all"))
+    st.write(agg_updated["describe"])
 
 
 # =========================
@@ -35,7 +88,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Ocean Proximity - 1990 Data")
     fig1, ax1 = plt.subplots()
-    counts_1990 = cl_data_1990["ocean_proximity"].value_counts(dropna=False)
+    counts_1990 = agg_1990["proximity"]["size"].sort_values(ascending=False)
     ax1.pie(counts_1990.values, labels=counts_1990.index, autopct="%1.1f%%")
     ax1.axis("equal")
     st.pyplot(fig1)
@@ -43,7 +96,7 @@ with col1:
 with col2:
     st.subheader("Ocean Proximity - Updated Data")
     fig2, ax2 = plt.subplots()
-    counts_updated = cl_data_updated["ocean_proximity"].value_counts(dropna=False)
+    counts_updated = agg_updated["proximity"]["size"].sort_values(ascending=False)
     ax2.pie(counts_updated.values, labels=counts_updated.index, autopct="%1.1f%%")
     ax2.axis("equal")
     st.pyplot(fig2)
@@ -54,39 +107,20 @@ with col2:
 # =========================
 st.header("Median House Value by Housing Age Range")
 
-# Define age bins and labels
-edges = [0, 10, 20, 30, 40, 50, 60, 70, 80, 100]
-xlabels = ["0-9", "10-19", "20-29", "30-39", "40-49",
-           "50-59", "60-69", "70-79", "80+"]
-
-# 1990 age bins
-age_bins_1990 = pd.cut(
-    cl_data_1990["housing_median_age"],
-    bins=edges,
-    right=False,
-    labels=xlabels
-)
-mean_value_1990 = cl_data_1990.groupby(age_bins_1990)["median_house_value"].mean()
-
-# Updated age bins (average_house_age)
-age_bins_updated = pd.cut(
-    cl_data_updated["average_house_age"],
-    bins=edges,
-    right=False,
-    labels=xlabels
-)
-mean_value_updated = cl_data_updated.groupby(age_bins_updated)["median_house_value"].mean()
+# Age bins of the chosen width up to 80, then one 80+ bin
+age_width = st.select_slider("Age range width (years)", options=[5, 10, 20], value=10)
+edges = list(range(0, 80, age_width)) + [80, 100]
+xlabels = [f"{lo}-{hi - 1}" for lo, hi in zip(edges[:-2], edges[1:-1])] + ["80+"]
 
-# Align on the same labels
-mean_value_1990 = mean_value_1990.reindex(xlabels)
-mean_value_updated = mean_value_updated.reindex(xlabels)
+mean_value_1990 = bin_means(agg_1990["age_index"], edges)
+mean_value_updated = bin_means(agg_updated["age_index"], edges)
 
 fig3, ax3 = plt.subplots()
 x = np.arange(len(xlabels))
 width = 0.35
 
-ax3.bar(x - width/2, mean_value_1990.values, width, label="1990 Data")
-ax3.bar(x + width/2, mean_value_updated.values, width, label="Updated Data")
+ax3.bar(x - width/2, mean_value_1990, width, label="1990 Data")
+ax3.bar(x + width/2, mean_value_updated, width, label="Updated Data")
 
 ax3.set_xticks(x)
 ax3.set_xticklabels(xlabels, rotation=45)
@@ -105,27 +139,12 @@ st.pyplot(fig3)
 # =========================
 st.header("Median House Value by Ocean Proximity")
 
-cats_1990 = cl_data_1990["ocean_proximity"].dropna().unique()
-cats_updated = cl_data_updated["ocean_proximity"].dropna().unique()
-all_categories = sorted(set(cats_1990).union(set(cats_updated)))
-
-mean_val_1990 = []
-mean_val_updated = []
+means_1990 = agg_1990["proximity"]["mean"]
+means_updated = agg_updated["proximity"]["mean"]
+all_categories = sorted(set(means_1990.index.dropna()).union(means_updated.index.dropna()))
 
-for group in all_categories:
-    # 1990
-    idx_1990 = cl_data_1990["ocean_proximity"] == group
-    if idx_1990.any():
-        mean_val_1990.append(cl_data_1990.loc[idx_1990, "median_house_value"].mean())
-    else:
-        mean_val_1990.append(np.nan)
-
-    # Updated
-    idx_updated = cl_data_updated["ocean_proximity"] == group
-    if idx_updated.any():
-        mean_val_updated.append(cl_data_updated.loc[idx_updated, "median_house_value"].mean())
-    else:
-        mean_val_updated.append(np.nan)
+mean_val_1990 = means_1990.reindex(all_categories)
+mean_val_updated = means_updated.reindex(all_categories)
 
 fig4, ax4 = plt.subplots()
 x = np.arange(len(all_categories))
@@ -151,25 +170,20 @@ st.pyplot(fig4)
 # =========================
 st.header("Box Plot: Median House Value Distributions")
 
-vals_1990 = cl_data_1990["median_house_value"].dropna()
-vals_updated = cl_data_updated["median_house_value"].dropna()
+vals_1990 = agg_1990["value_index"]["keys"]
+vals_updated = agg_updated["value_index"]["keys"]
 
 fig5, ax5 = plt.subplots()
-ax5.boxplot([vals_1990.values, vals_updated.values],
+ax5.boxplot([vals_1990, vals_updated],
             labels=["1990", "Updated"])
 ax5.set_title("Comparison of Median House Value Distributions")
 ax5.set_ylabel("Median House Value ($)")
 st.pyplot(fig5)
 
-# Max and Min values
-max_value_1990 = vals_1990.max()
-min_value_1990 = vals_1990.min()
-max_value_updated = vals_updated.max()
-min_value_updated = vals_updated.min()
-
+# Max and Min values (the value index is sorted)
 st.subheader("Max and Min Median House Values")
-st.text(f"1990 Data:   Max = ${max_value_1990:,.2f}, Min = ${min_value_1990:,.2f}")
-st.text(f"Updated Data: Max = ${max_value_updated:,.2f}, Min = ${min_value_updated:,.2f}")
+st.text(f"1990 Data:   Max = ${vals_1990[-1]:,.2f}, Min = ${vals_1990[0]:,.2f}")
+st.text(f"Updated Data: Max = ${vals_updated[-1]:,.2f}, Min = ${vals_updated[0]:,.2f}")
 
 
 # =========================
@@ -177,23 +191,14 @@ st.text(f"Updated Data: Max = ${max_value_updated:,.2f}, Min = ${min_value_updat
 # =========================
 st.header("Median House Value Distribution by Price Range")
 
-# Extract values again (including NaN drop)
-vals_1990 = cl_data_1990["median_house_value"].dropna().values
-vals_updated = cl_data_updated["median_house_value"].dropna().values
-
-# Bin edges
-edges_val = [0, 100000, 200000, 300000, 400000, 500000, np.inf]
-labels_val = [
-    "0–100k",
-    "100–200k",
-    "200–300k",
-    "300–400k",
-    "400–500k",
-    ">500k"
-]
+# Ranges of the chosen width up to $500k, then one >500k bin
+value_width = st.select_slider("Price range width ($)", options=[50000, 100000, 250000], value=100000,
+                               format_func=lambda w: f"{w // 1000}k")
+edges_val = list(range(0, 500000, value_width)) + [500000, np.inf]
+labels_val = [f"{lo // 1000}–{hi // 1000}k" for lo, hi in zip(edges_val[:-2], edges_val[1:-1])] + [">500k"]
 
-counts_1990, _ = np.histogram(vals_1990, bins=edges_val)
-counts_updated, _ = np.histogram(vals_updated, bins=edges_val)
+counts_1990 = bin_counts(agg_1990["value_index"], edges_val)
+counts_updated = bin_counts(agg_updated["value_index"], edges_val)
 
 fig6, ax6 = plt.subplots()
 x = np.arange(len(labels_val))
@@ -212,3 +217,143 @@ ax6.grid(axis="y")
 
 fig6.tight_layout()
 st.pyplot(fig6)
+
+
+# =========================
+# Block-Level Change: nearest updated record per 1990 block
+# =========================
+st.header("Block-Level Change (1990 vs Updated)")
+
+@st.cache_data
+def matched_changes(radius_km):
+   return block_changes(cl_data_1990, cl_data_updated, radius_km)
+
+radius_km = st.slider("Match radius (km)", 0.5, 10.0, 2.0, step=0.5)
+changes = matched_changes(radius_km)
+
+st.text(f"Matched {len(changes):,} of {len(cl_data_1990):,} 1990 blocks to an updated record "
+        f"within {radius_km} km")
+
+if changes.empty:
+   st.write("No blocks matched; try a larger radius.")
+else:
+   col1, col2 = st.columns(2)
+   col1.metric("Median value growth", f"{changes['value_growth_pct'].median():,.0f}%")
+   col2.metric("Median income growth", f"{changes['income_growth_pct'].median():,.0f}%")
+
+   fig7, ax7 = plt.subplots(figsize=(7, 7))
+   # clip the colour scale so a few extreme blocks do not wash out the map
+   low, high = np.percentile(changes["value_growth_pct"], [5, 95])
+   points = ax7.scatter(changes["longitude"], changes["latitude"], c=changes["value_growth_pct"],
+                        s=2, cmap="viridis", vmin=low, vmax=high)
+   fig7.colorbar(points, ax=ax7, label="Median House Value Growth (%)")
+   ax7.set_xlabel("Longitude")
+   ax7.set_ylabel("Latitude")
+   ax7.set_title("House Value Growth by Location")
+   ax7.set_aspect("equal")
+   st.pyplot(fig7)
+
+   st.caption("1990 income is the block median; updated income is the record's average "
+              "household income.")
+   st.dataframe(changes.sort_values("value_growth_pct", ascending=False), use_container_width=True)
+
+
+# =========================
+# Heatmap: density / value rasterized on the server
+# =========================
+st.header("Housing Heatmap")
+
+@st.cache_data
+def housing_rasters(bins):
+   return rasterize(cl_data_1990, bins), rasterize(cl_data_updated, bins)
+
+@st.cache_data
+def heatmap_image(view, layer, bins):
+   rasters_1990, rasters_updated = housing_rasters(bins)
+   if view == "Difference (Updated - 1990)":
+      grid = difference_grid(rasters_1990, rasters_updated, layer)
+      cmap, diverging = "RdBu_r", True
+   else:
+      grid = layer_grid(rasters_1990 if view == "1990" else rasters_updated, layer)
+      cmap, diverging = "viridis", False
+   vmin, vmax = color_limits(grid, diverging)
+   return grid_to_png_url(grid, cmap, vmin, vmax), vmin, vmax
+
+col1, col2, col3 = st.columns(3)
+view = col1.radio("Dataset", ["1990", "Updated", "Difference (Updated - 1990)"])
+layer_label = col2.radio("Layer", ["Mean house value", "Block density"])
+bins = col3.select_slider("Grid cells per side", options=[100, 200, 400], value=200)
+layer = "value" if layer_label == "Mean house value" else "density"
+
+image_url, vmin, vmax = heatmap_image(view, layer, bins)
+
+west, east, south, north = CA_EXTENT
+deck = pdk.Deck(
+   layers=[pdk.Layer("BitmapLayer", image=image_url, bounds=[west, south, east, north], opacity=0.8)],
+   initial_view_state=pdk.ViewState(latitude=(south + north) / 2, longitude=(west + east) / 2, zoom=4.8),
+)
+st.pydeck_chart(deck)
+
+if layer == "value":
+   st.caption(f"Colour range: ${vmin:,.0f} to ${vmax:,.0f} (mean median house value per cell)")
+else:
+   st.caption(f"Colour range: {vmin:,.2f} to {vmax:,.2f} "
+              + ("(change in blocks per cell)" if view.startswith("Difference") else "(log10 blocks per cell)"))
+
+
+# =========================
+# House Value Model: trained once on 1990, what-if scoring of updated blocks
+# =========================
+st.header("House Value Model (Trained on 1990 Data)")
+
+@st.cache_resource
+def house_value_model():
+   return load_or_train(cl_data_1990)
+
+@st.cache_data
+def updated_model_inputs():
+   features = features_updated(cl_data_updated)
+   finite = np.isfinite(features.drop(columns="ocean_proximity").to_numpy(dtype=float)).all(axis=1)
+   return features[finite].reset_index(drop=True)
+
+model = house_value_model()
+scenario_base = updated_model_inputs()
+baseline = predict(model, scenario_base)
+
+col1, col2 = st.columns(2)
+col1.metric("R² on 1990 data", f"{model['r2']:.3f}")
+col2.metric("Training blocks", f"{model['n_train']:,}")
+
+with st.expander("Show model coefficients"):
+   st.write(pd.DataFrame({"coefficient": model["coef"]}, index=coefficient_names(model)))
+
+st.subheader("What-if: Updated Blocks Under Changed Conditions")
+col1, col2, col3 = st.columns(3)
+income_change = col1.slider("Income change (%)", -50, 100, 0, step=5)
+age_change = col2.slider("House age change (years)", -20, 20, 0)
+rooms_change = col3.slider("Rooms per household change (%)", -50, 50, 0, step=5)
+
+scenario = scenario_base.assign(
+   median_income=scenario_base["median_income"] * (1 + income_change / 100),
+   housing_median_age=scenario_base["housing_median_age"] + age_change,
+   rooms_per_household=scenario_base["rooms_per_household"] * (1 + rooms_change / 100),
+)
+scored = predict(model, scenario)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Blocks scored", f"{len(scored):,}")
+col2.metric("Mean predicted value", f"${scored.mean():,.0f}")
+col3.metric("Change vs. current conditions", f"{(scored.mean() / baseline.mean() - 1) * 100:+.1f}%")
+
+fig8, ax8 = plt.subplots()
+bins_pred = np.histogram_bin_edges(np.concatenate([baseline, scored]), bins=40)
+ax8.hist(baseline, bins=bins_pred, alpha=0.5, label="Current conditions")
+ax8.hist(scored, bins=bins_pred, alpha=0.5, label="What-if")
+ax8.set_xlabel("Predicted Median House Value (1990 $ model)")
+ax8.set_ylabel("Number of Blocks")
+ax8.legend()
+ax8.grid(axis="y")
+st.pyplot(fig8)
+
+st.caption("The model is fit to 1990 prices, so predictions show how the updated blocks' "
+           "characteristics would have been valued in 1990, not current prices.")
@@ -1,51 +1,53 @@
+import sys
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR))
+from build_housing_data import CLEANING_VERSION, cleaned_path, load_cleaned, load_raw
+
 st.title("California Housing Prices")
 
-# Load datasets
-data_updated = pd.read_csv(BASE_DIR / "california_housing_updated.csv")
-data_1990 = pd.read_csv(BASE_DIR / "california_housing_1990.csv")
+# Cleaning runs offline (python build_housing_data.py); this page only reads
+@st.cache_data
+def dataset_summaries(dataset):
+    raw = load_raw(dataset)
+    cleaned = load_cleaned(dataset)
+    return (len(raw), raw.describe(include='all'), len(cleaned), cleaned.describe(include='all'),
+            cleaned_path(dataset))
+
+rows_1990, summary_1990, cl_rows_1990, cl_summary_1990, built_1990 = dataset_summaries("1990")
+rows_updated, summary_updated, cl_rows_updated, cl_summary_updated, built_updated = dataset_summaries("updated")
 
 # Display number of entries before cleaning
-st.write(f"Number of entries in 1990 dataset: {len(data_1990)}")
-st.write(f"Number of entries in updated dataset: {len(data_updated)}")
+st.write(f"Number of entries in 1990 dataset: {rows_1990}")
+st.write(f"Number of entries in updated dataset: {rows_updated}")
 
 # Show summary of data
 st.subheader("Summary – 1990 Dataset")
-st.write(data_1990.describe(include='all'))
+st.write(summary_1990)
 
 st.subheader("Summary – Updated Dataset")
-st.write(data_updated.describe(include='all'))
-
-# Remove entries with missing data
-data_updated = data_updated.dropna()
-data_1990 = data_1990.dropna()
-
-# Remove rows with -666666666
-rows_to_delete = (data_updated.iloc[:, 1:10] == -666666666).any(axis=1)
-if rows_to_delete.any():
-    data_updated = data_updated[~rows_to_delete]
-
-# Replace "ISLAND" with "NEAR OCEAN" in ocean_proximity column (1990 dataset)
-if 'ocean_proximity' in data_1990.columns:
-    data_1990['ocean_proximity'] = data_1990['ocean_proximity'].replace("ISLAND", "NEAR OCEAN")
+st.write(summary_updated)
 
 # Display number of entries after cleaning
-st.write(f"Number of entries in cleaned 1990 dataset: {len(data_1990)}")
-st.write(f"Number of entries in cleaned updated dataset: {len(data_updated)}")
+st.write(f"Number of entries in cleaned 1990 dataset: {cl_rows_1990}")
+st.write(f"Number of entries in cleaned updated dataset: {cl_rows_updated}")
 
 # Show new summary
 st.subheader("Cleaned Summary – 1990 Dataset")
-st.write(data_1990.describe(include='all'))
+st.write(cl_summary_1990)
 
 st.subheader("Cleaned Summary – Updated Dataset")
-st.write(data_updated.describe(include='all'))
-
-# Write cleaned data sets
-data_updated.to_csv('cleaned_california_housing_updated.csv', index=False)
-data_1990.to_csv('cleaned_california_housing_1990.csv', index=False)
-
-st.success("Cleaned data files saved successfully!")
+st.write(cl_summary_updated)
+
+if built_1990 and built_updated:
+    st.caption(
+        f"Cleaned data (rules v{CLEANING_VERSION}) read from "
+        f"{built_1990.relative_to(BASE_DIR)} and {built_updated.relative_to(BASE_DIR)}."
+    )
+else:
+    st.caption(
+        f"No up-to-date build for the raw CSVs; cleaned in memory (rules v{CLEANING_VERSION}). "
+        "Run python build_housing_data.py to build."
+    )
@@ -0,0 +1,140 @@
+"""
+Offline build step for the cleaned California housing datasets.
+
+Applies the cleaning from CA_Housing_Cleaner.m (drop rows with missing
+values, drop rows of the updated data holding the -666666666 sentinel,
+fold ISLAND into NEAR OCEAN in the 1990 data) and writes versioned parquet
+files under cleaned/v<CLEANING_VERSION>/, then trains the house-value model
+on the cleaned 1990 data and saves it under models/. Each file is written to a
+temporary name and moved into place, so pages never see a partial file.
+Bump CLEANING_VERSION whenever the cleaning rules change.
+
+Usage:
+    python build_housing_data.py
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from house_value_model import MODEL_DIR, model_path, save_model, train
+
+BASE_DIR = Path(__file__).resolve().parent
+
+CLEANING_VERSION = 1
+OUTPUT_DIR = BASE_DIR / "cleaned" / f"v{CLEANING_VERSION}"
+
+RAW_FILES = {
+    "1990": BASE_DIR / "california_housing_1990.csv",
+    "updated": BASE_DIR / "california_housing_updated.csv",
+}
+
+SENTINEL = -666666666
+
+
+def load_raw(dataset):
+    """Read one raw dataset ("1990" or "updated")."""
+    return pd.read_csv(RAW_FILES[dataset])
+
+
+def clean(df, dataset):
+    """Apply the cleaning rules for one dataset."""
+    df = df.dropna()
+
+    if dataset == "updated":
+        # numeric columns between the name and ocean_proximity columns
+        rows_to_delete = (df.iloc[:, 1:10] == SENTINEL).any(axis=1)
+        df = df[~rows_to_delete]
+
+    if dataset == "1990" and "ocean_proximity" in df.columns:
+        df = df.assign(ocean_proximity=df["ocean_proximity"].replace("ISLAND", "NEAR OCEAN"))
+
+    return df.reset_index(drop=True)
+
+
+def cleaned_path(dataset, output_dir=OUTPUT_DIR):
+    """Path of the built output for dataset, or None if it is missing or stale.
+
+    The build counts only if its manifest exists (written last), matches
+    CLEANING_VERSION and records the hash of the current raw CSV.
+    """
+    manifest_path = Path(output_dir) / "manifest.json"
+    if not manifest_path.exists():
+        return None
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    entry = manifest.get("datasets", {}).get(dataset)
+    if manifest.get("version") != CLEANING_VERSION or entry is None:
+        return None
+
+    path = Path(output_dir) / entry["output"]
+    if not path.exists() or entry["source_sha256"] != _file_hash(RAW_FILES[dataset]):
+        return None
+    return path
+
+
+def load_cleaned(dataset):
+    """Read the built cleaned dataset, or clean the raw CSV in memory if there is no valid build."""
+    path = cleaned_path(dataset)
+    if path is not None:
+        return pd.read_parquet(path)
+    return clean(load_raw(dataset), dataset)
+
+
+def _file_hash(path):
+    """SHA-256 of a file's bytes."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _write_atomic(path, write):
+    """Write via a temporary sibling file, then move it into place."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def build(output_dir=OUTPUT_DIR):
+    """Clean every raw dataset into output_dir; returns the manifest."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {"version": CLEANING_VERSION, "datasets": {}}
+    for dataset, raw_path in RAW_FILES.items():
+        raw = load_raw(dataset)
+        cleaned = clean(raw, dataset)
+
+        out_path = output_dir / f"california_housing_{dataset}.parquet"
+        _write_atomic(out_path, lambda p: cleaned.to_parquet(p, index=False))
+
+        manifest["datasets"][dataset] = {
+            "source": raw_path.name,
+            "source_sha256": _file_hash(raw_path),
+            "rows_before": len(raw),
+            "rows_after": len(cleaned),
+            "output": out_path.name,
+        }
+        print(f"{dataset}: {len(raw):,} -> {len(cleaned):,} rows  ({out_path})")
+
+        if dataset == "1990":
+            # train on the frame as the pages will read it back
+            training = pd.read_parquet(out_path)
+            path = model_path(training, MODEL_DIR)
+            save_model(train(training), path)
+            print(f"house value model saved to {path}")
+
+    # manifest last: its presence marks a complete build
+    _write_atomic(
+        output_dir / "manifest.json",
+        lambda p: p.write_text(json.dumps(manifest, indent=2), encoding="utf-8"),
+    )
+    return manifest
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,128 @@
+"""
+Linear house-value model trained on the cleaned 1990 data.
+
+Features: median_income, housing_median_age, rooms per household and a
+one-hot ocean_proximity (the first category is the baseline). The build step
+(build_housing_data.py) saves the fitted coefficients under models/ keyed
+by a hash of the training data; pages only load them, falling back to an
+in-memory fit when the data (or MODEL_VERSION) has changed since the build.
+Scoring is a single matrix product, cheap enough to redo per slider move.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+MODEL_DIR = BASE_DIR / "models"
+MODEL_VERSION = 1
+
+NUMERIC_FEATURES = ["median_income", "housing_median_age", "rooms_per_household"]
+TARGET = "median_house_value"
+
+
+def features_1990(df):
+    """Model inputs from the 1990 dataset."""
+    return pd.DataFrame({
+        "median_income": df["median_income"],
+        "housing_median_age": df["housing_median_age"],
+        "rooms_per_household": df["total_rooms"] / df["households"],
+        "ocean_proximity": df["ocean_proximity"],
+    })
+
+
+def features_updated(df):
+    """Model inputs from the updated dataset, in 1990 units (income in $10k)."""
+    return pd.DataFrame({
+        "median_income": df["average_household_income"] / 10_000,
+        "housing_median_age": df["average_house_age"],
+        "rooms_per_household": df["total_rooms"] / df["total_households"],
+        "ocean_proximity": df["ocean_proximity"],
+    })
+
+
+def design_matrix(features, categories):
+    """Intercept, numeric features and one-hot proximity (unknown categories -> baseline)."""
+    numeric = features[NUMERIC_FEATURES].to_numpy(dtype=float)
+    proximity = features["ocean_proximity"].to_numpy()
+    one_hot = (proximity[:, None] == np.asarray(categories[1:])[None, :]).astype(float)
+    return np.column_stack([np.ones(len(features)), numeric, one_hot])
+
+
+def data_hash(df):
+    """Key for the trained model: hash of the training columns and MODEL_VERSION."""
+    hasher = hashlib.sha256(f"v{MODEL_VERSION}".encode())
+    hasher.update(pd.util.hash_pandas_object(df[[TARGET, "median_income", "housing_median_age",
+                                                 "total_rooms", "households", "ocean_proximity"]],
+                                             index=False).to_numpy().tobytes())
+    return hasher.hexdigest()[:16]
+
+
+def train(df):
+    """Least-squares fit on the 1990 data; returns the model dict."""
+    features = features_1990(df)
+    valid = np.isfinite(features[NUMERIC_FEATURES].to_numpy(dtype=float)).all(axis=1)
+    valid &= features["ocean_proximity"].notna().to_numpy() & df[TARGET].notna().to_numpy()
+    features, target = features[valid], df[TARGET].to_numpy(dtype=float)[valid]
+
+    categories = sorted(features["ocean_proximity"].unique())
+    X = design_matrix(features, categories)
+    coef, *_ = np.linalg.lstsq(X, target, rcond=None)
+
+    residuals = target - X @ coef
+    r2 = 1 - (residuals ** 2).sum() / ((target - target.mean()) ** 2).sum()
+    return {
+        "coef": coef,
+        "categories": np.asarray(categories),
+        "r2": float(r2),
+        "n_train": int(valid.sum()),
+    }
+
+
+def coefficient_names(model):
+    """Labels matching the coefficient vector."""
+    return ["intercept"] + NUMERIC_FEATURES + [f"ocean_proximity={c}" for c in model["categories"][1:]]
+
+
+def predict(model, features):
+    """Predicted median house value for every row in one matrix product."""
+    return design_matrix(features, list(model["categories"])) @ model["coef"]
+
+
+def model_path(df, model_dir=MODEL_DIR):
+    """Where the model trained on df is saved."""
+    return Path(model_dir) / f"house_value_{data_hash(df)}.npz"
+
+
+def save_model(model, path):
+    """Write the model through a uniquely named temporary file, then move it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npz", delete=False) as tmp:
+        np.savez(tmp, **model)
+    os.replace(tmp.name, path)
+
+
+def load_model(path):
+    """Read a model written by save_model."""
+    with np.load(path) as saved:
+        return {
+            "coef": saved["coef"],
+            "categories": saved["categories"],
+            "r2": float(saved["r2"]),
+            "n_train": int(saved["n_train"]),
+        }
+
+
+def load_or_train(df, model_dir=MODEL_DIR):
+    """The saved model for this training data, or an in-memory fit if none was built.
+
+    Nothing is written here; build_housing_data.py trains and saves the model.
+    """
+    path = model_path(df, model_dir)
+    if path.exists():
+        return load_model(path)
+    return train(df)
@@ -0,0 +1,69 @@
+"""
+Server-side rasterization of the housing blocks for map overlays.
+
+Blocks are binned into a fixed grid over California with np.histogram2d, so
+the rendered PNG has the same size whether a dataset has 2k or 2M blocks.
+"""
+import base64
+import io
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import colormaps
+
+# west, east, south, north
+CA_EXTENT = (-124.6, -114.1, 32.4, 42.1)
+
+
+def rasterize(df, bins=200, extent=CA_EXTENT):
+    """Block counts and mean median_house_value per grid cell (rows run south to north)."""
+    west, east, south, north = extent
+    cell_range = [[south, north], [west, east]]
+    lat, lon = df["latitude"].to_numpy(), df["longitude"].to_numpy()
+
+    counts, _, _ = np.histogram2d(lat, lon, bins=bins, range=cell_range)
+    sums, _, _ = np.histogram2d(lat, lon, bins=bins, range=cell_range,
+                                weights=df["median_house_value"].to_numpy())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_value = sums / counts
+    return {"density": counts, "value": mean_value}
+
+
+def layer_grid(rasters, layer):
+    """Display grid for one layer: log10 block density, or mean value; empty cells NaN."""
+    if layer == "density":
+        counts = rasters["density"]
+        return np.where(counts > 0, np.log10(np.maximum(counts, 1)), np.nan)
+    return rasters["value"]
+
+
+def difference_grid(rasters_before, rasters_after, layer):
+    """After minus before; density cells empty in both, or value cells empty in either, are NaN."""
+    if layer == "density":
+        before, after = rasters_before["density"], rasters_after["density"]
+        return np.where((before > 0) | (after > 0), after - before, np.nan)
+    return rasters_after["value"] - rasters_before["value"]
+
+
+def color_limits(grid, diverging=False):
+    """2nd-98th percentile range of the filled cells, symmetric around 0 if diverging."""
+    filled = grid[np.isfinite(grid)]
+    if filled.size == 0:
+        return 0.0, 1.0
+    low, high = np.percentile(filled, [2, 98])
+    if diverging:
+        bound = max(abs(low), abs(high)) or 1.0
+        return -bound, bound
+    return (low, high) if high > low else (low, low + 1.0)
+
+
+def grid_to_png_url(grid, cmap, vmin, vmax):
+    """Encode a grid as a transparent-background PNG data URL (north at the top)."""
+    scaled = np.clip((grid - vmin) / (vmax - vmin), 0, 1)
+    rgba = colormaps[cmap](np.nan_to_num(scaled))
+    rgba[~np.isfinite(grid), 3] = 0
+
+    buf = io.BytesIO()
+    plt.imsave(buf, np.flipud(rgba), format="png")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
@@ -0,0 +1,66 @@
+"""
+Spatial matching between the 1990 block groups and the updated records.
+
+Coordinates are placed on a sphere, so straight-line (chord) distances in a
+KD-tree order points exactly like great-circle distances. Building the tree
+is O(n log n) and each nearest-neighbour query is O(log n).
+"""
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_sphere(longitude, latitude):
+    """Longitude/latitude in degrees -> (n, 3) points on the unit sphere."""
+    lon = np.radians(np.asarray(longitude, dtype=float))
+    lat = np.radians(np.asarray(latitude, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def nearest_within(source, target, radius_km):
+    """Index of each source row's nearest target row within radius_km, and the distance.
+
+    Rows with no target inside the radius get index -1 and distance NaN.
+    """
+    tree = cKDTree(to_unit_sphere(target["longitude"], target["latitude"]))
+    chord = 2 * np.sin(radius_km / (2 * EARTH_RADIUS_KM))
+    dist, idx = tree.query(
+        to_unit_sphere(source["longitude"], source["latitude"]),
+        distance_upper_bound=chord,
+    )
+
+    found = np.isfinite(dist)
+    idx = np.where(found, idx, -1)
+    dist_km = np.full(len(dist), np.nan)
+    dist_km[found] = 2 * EARTH_RADIUS_KM * np.arcsin(dist[found] / 2)
+    return idx, dist_km
+
+
+def block_changes(data_1990, data_updated, radius_km=2.0):
+    """Per-location change dataset: each matched 1990 block with its nearest updated record.
+
+    The 1990 median_income is in tens of thousands of dollars and is scaled
+    to dollars before comparing with the updated average_household_income.
+    """
+    idx, dist_km = nearest_within(data_1990, data_updated, radius_km)
+    matched = idx >= 0
+
+    before = data_1990[matched].reset_index(drop=True)
+    after = data_updated.iloc[idx[matched]].reset_index(drop=True)
+
+    changes = pd.DataFrame({
+        "longitude": before["longitude"],
+        "latitude": before["latitude"],
+        "county": after["name"],
+        "ocean_proximity": before["ocean_proximity"],
+        "distance_km": dist_km[matched],
+        "value_1990": before["median_house_value"],
+        "value_updated": after["median_house_value"],
+        "income_1990": before["median_income"] * 10_000,
+        "income_updated": after["average_household_income"],
+    })
+    changes["value_growth_pct"] = (changes["value_updated"] / changes["value_1990"] - 1) * 100
+    changes["income_growth_pct"] = (changes["income_updated"] / changes["income_1990"] - 1) * 100
+    return changes
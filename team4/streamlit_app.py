@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
+from pandas.api.types import union_categoricals
 from pathlib import Path
+import string
+import io
 import numpy as np
 import altair as alt
 import pydeck as pdk
@@ -13,25 +16,120 @@ st.set_page_config(
 )
 
 
+DATA_URL = ""  # optional
+LOCAL_DATA_PATH = Path(__file__).parent / "data" / "gun-violence-data_01-2013_03-2018.csv"
+
+CSV_CHUNK_SIZE = 50_000
+CSV_DATE_FORMAT = "%Y-%m-%d"
+
+# Columns the dashboard actually uses, with the dtype each is read as.
+INCIDENT_DTYPES = {
+    "incident_id": "int64",
+    "date": "object",
+    "state": "category",
+    "city_or_county": "category",
+    "n_killed": "float32",
+    "n_injured": "float32",
+    "latitude": "float32",
+    "longitude": "float32",
+    "incident_characteristics": "object",
+    "participant_age": "object",
+    "participant_age_group": "object",
+    "participant_gender": "object",
+    "participant_type": "object",
+    "participant_status": "object",
+    "participant_relationship": "object",
+    "gun_type": "object",
+    "gun_stolen": "object",
+}
+
+# Wide free-text columns kept out of the main frame and loaded on demand.
+TEXT_DTYPES = {
+    "incident_id": "int64",
+    "notes": "object",
+    "incident_url": "object",
+    "source_url": "object",
+    "sources": "object",
+}
+
+URL_COLUMNS = ["incident_url", "source_url", "source_url_2", "source_url_3"]
+# failures reading the text side table: missing/unreachable file, bad CSV, bad dtypes
+TEXT_READ_ERRORS = (OSError, pd.errors.EmptyDataError, pd.errors.ParserError, ValueError)
+
+
+def _data_source():
+    """Return the CSV location to read from, or None if there is no dataset."""
+
+    if DATA_URL:
+        return DATA_URL
+    if LOCAL_DATA_PATH.exists():
+        return LOCAL_DATA_PATH
+    return None
+
+
+def _read_csv_chunks(source, dtypes: dict):
+    """Stream the CSV in fixed-size chunks, reading only the given columns."""
+
+    return pd.read_csv(
+        source,
+        usecols=lambda c: c in dtypes,
+        dtype=dtypes,
+        chunksize=CSV_CHUNK_SIZE,
+    )
+
+
+def _concat_chunks(chunks: list) -> pd.DataFrame:
+    """Concatenate chunks, unifying categories so categorical columns stay categorical."""
+
+    if not chunks:
+        return pd.DataFrame()
+
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([c[col] for c in chunks]).categories
+            for c in chunks:
+                c[col] = c[col].cat.set_categories(categories)
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _prepare_incidents(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates and derive year / month and numeric outcome columns."""
+
+    df["date"] = pd.to_datetime(df["date"], format=CSV_DATE_FORMAT, errors="coerce")
+    df = df.dropna(subset=["date"])
+
+    df["year"] = df["date"].dt.year.astype("int16")
+    df["month"] = df["date"].dt.to_period("M").dt.to_timestamp()
+
+    for col in ["n_killed", "n_injured"]:
+        df[col] = pd.to_numeric(df.get(col, 0), errors="coerce").fillna(0).astype("int16")
+
+    return df
+
+
+def _read_incidents(source) -> pd.DataFrame:
+    """Read the incident table chunk by chunk so wide text never sits in memory at once."""
+
+    chunks = [_prepare_incidents(chunk) for chunk in _read_csv_chunks(source, INCIDENT_DTYPES)]
+    return _concat_chunks(chunks)
+
+
 @st.cache_data
 def load_gun_violence_data():
     """Load gun violence data safely (local or fallback demo)."""
 
-    data_url = ""  # optional
-
     df = None
 
-    if data_url:
+    if DATA_URL:
         try:
-            df = pd.read_csv(data_url, parse_dates=["date"])
+            df = _read_incidents(DATA_URL)
         except Exception:
             st.warning("Could not load data from URL, using local/demo data.")
 
     if df is None:
-        local_path = Path(__file__).parent / "data" / "gun-violence-data_01-2013_03-2018.csv"
-
-        if local_path.exists():
-            df = pd.read_csv(local_path, parse_dates=["date"])
+        if LOCAL_DATA_PATH.exists():
+            df = _read_incidents(LOCAL_DATA_PATH)
         else:
             st.warning("⚠️ Dataset not found. Using demo data.")
 
@@ -40,23 +138,84 @@ def load_gun_violence_data():
 
             df = pd.DataFrame({
                 "incident_id": range(500),
-                "date": dates,
-                "state": np.random.choice(["CA", "TX", "NY", "FL"], 500),
+                "date": dates.strftime(CSV_DATE_FORMAT),
+                "state": pd.Categorical(np.random.choice(["CA", "TX", "NY", "FL"], 500)),
                 "n_killed": np.random.randint(0, 5, 500),
                 "n_injured": np.random.randint(0, 10, 500),
-                "city_or_county": "Demo City",
+                "city_or_county": pd.Categorical(["Demo City"] * 500),
                 "incident_characteristics": "Demo",
-                "latitude": np.random.uniform(25, 45, 500),
-                "longitude": np.random.uniform(-120, -70, 500)
+                "latitude": np.random.uniform(25, 45, 500).astype("float32"),
+                "longitude": np.random.uniform(-120, -70, 500).astype("float32"),
             })
+            df = _prepare_incidents(df)
 
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.to_period("M").dt.to_timestamp()
+    # date-sorted layout: every year range is one contiguous block of rows, and
+    # row labels double as positions for the precomputed sort indexes
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
 
-    for col in ["n_killed", "n_injured"]:
-        df[col] = pd.to_numeric(df.get(col, 0), errors="coerce").fillna(0)
 
-    return df
+@st.cache_resource
+def load_incident_text() -> pd.DataFrame:
+    """Load notes / URL / source text as a side table indexed by incident_id.
+
+    Only read the first time a table page, an opted-in map or a search needs
+    it, and shared across sessions rather than copied on every rerun. Read
+    errors (``TEXT_READ_ERRORS``) propagate so a failed read is not cached.
+    """
+
+    empty = pd.DataFrame(
+        columns=[c for c in TEXT_DTYPES if c != "incident_id"],
+        index=pd.Index([], name="incident_id", dtype="int64"),
+    )
+
+    source = _data_source()
+    if source is None:
+        return empty
+
+    chunks = [chunk.set_index("incident_id") for chunk in _read_csv_chunks(source, TEXT_DTYPES)]
+    return pd.concat(chunks) if chunks else empty
+
+
+@st.cache_data
+def _csv_header(source) -> list:
+    """Column names of the CSV, without reading any rows."""
+
+    return list(pd.read_csv(source, nrows=0).columns)
+
+
+def incident_text_columns() -> list:
+    """Side-table columns present in the CSV header."""
+
+    source = _data_source()
+    if source is None:
+        return []
+
+    try:
+        header = _csv_header(source)
+    except TEXT_READ_ERRORS as e:
+        st.warning(f"Could not read the incident data header: {type(e).__name__}: {e}")
+        return []
+
+    return [c for c in TEXT_DTYPES if c != "incident_id" and c in header]
+
+
+def attach_incident_text(df: pd.DataFrame, columns) -> tuple:
+    """Join the requested side-table columns onto ``df``; return it with the columns found."""
+
+    if not columns or "incident_id" not in df.columns:
+        return df, []
+
+    try:
+        text = load_incident_text()
+    except TEXT_READ_ERRORS as e:
+        st.warning(f"Could not load incident notes and links: {type(e).__name__}: {e}")
+        return df, []
+
+    found = [c for c in columns if c in text.columns]
+    if not found:
+        return df, []
+
+    return df.join(text[found], on="incident_id"), found
 
 
 @st.cache_data
@@ -187,6 +346,323 @@ def build_gun_table(df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+SEARCH_SPLIT_PATTERN = r"\|\||\s+"
+EMPTY_POSTINGS = np.array([], dtype="int64")
+
+
+def tokenize_search_text(text: pd.Series) -> pd.Series:
+    """Split text on '||' and whitespace into lowercase tokens, one row per token."""
+
+    tokens = (
+        text.fillna("")
+        .astype(str)
+        .str.lower()
+        .str.split(SEARCH_SPLIT_PATTERN, regex=True)
+        .explode()
+        .str.strip(string.punctuation)
+    )
+    return tokens[tokens.str.len() > 0]
+
+
+@st.cache_resource
+def build_search_index() -> dict:
+    """Build an inverted index from token to sorted incident_id array.
+
+    Covers ``incident_characteristics`` from the incident table and ``notes``
+    from the text side table. Built once and shared across sessions.
+    """
+
+    sources = []
+
+    data = load_gun_violence_data()
+    if "incident_characteristics" in data.columns:
+        sources.append(data.set_index("incident_id")["incident_characteristics"])
+
+    try:
+        text = load_incident_text()
+    except TEXT_READ_ERRORS as e:
+        st.warning(f"Searching without incident notes, which could not be loaded: {type(e).__name__}: {e}")
+    else:
+        if "notes" in text.columns:
+            sources.append(text["notes"])
+
+    if not sources:
+        return {}
+
+    tokens = pd.concat([tokenize_search_text(s) for s in sources])
+    pairs = (
+        pd.DataFrame({"token": tokens.to_numpy(), "incident_id": tokens.index.to_numpy()})
+        .drop_duplicates()
+        .sort_values(["token", "incident_id"])
+    )
+
+    token_arr = pairs["token"].to_numpy()
+    id_arr = pairs["incident_id"].to_numpy(dtype="int64")
+
+    if len(token_arr) == 0:
+        return {}
+
+    # sorted layout: each token's postings are one contiguous run of id_arr
+    starts = np.flatnonzero(token_arr[1:] != token_arr[:-1]) + 1
+    bounds = np.concatenate([[0], starts, [len(token_arr)]])
+
+    return {
+        token_arr[lo]: id_arr[lo:hi]
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    }
+
+
+def search_incidents(index: dict, query: str):
+    """Return sorted incident ids matching every token in ``query``, or None if it is empty."""
+
+    terms = tokenize_search_text(pd.Series([query])).unique()
+    if len(terms) == 0:
+        return None
+
+    # intersect from the shortest posting list up so each step stays small
+    postings = sorted((index.get(t, EMPTY_POSTINGS) for t in terms), key=len)
+
+    hits = postings[0]
+    for other in postings[1:]:
+        if hits.size == 0:
+            break
+        pos = np.searchsorted(other, hits).clip(max=len(other) - 1)
+        hits = hits[other[pos] == hits]
+
+    return hits
+
+
+def in_sorted(values, sorted_ids: np.ndarray) -> np.ndarray:
+    """Boolean mask of ``values`` present in the sorted unique array ``sorted_ids``."""
+
+    values = np.asarray(values)
+    if sorted_ids.size == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.searchsorted(sorted_ids, values).clip(max=len(sorted_ids) - 1)
+    return sorted_ids[pos] == values
+
+
+def narrow_ids(incident_ids, ids) -> np.ndarray:
+    """Intersect the current id filter (None = no filter yet) with more incident ids."""
+
+    ids = np.unique(ids)
+    return ids if incident_ids is None else np.intersect1d(incident_ids, ids, assume_unique=True)
+
+
+OUTCOME_COLUMNS = ["n_killed", "n_injured"]
+
+
+@st.cache_resource
+def build_gun_outcome_histograms() -> dict:
+    """Precompute per (year, state, gun_type) count histograms of incident outcomes.
+
+    Returns one long-form frame per outcome column with columns
+    year, state, gun_type, value, count. Each (incident, gun type) pair is
+    counted once, matching the row-level merge it replaces.
+    """
+
+    data = load_gun_violence_data()
+    guns = build_gun_table(data)
+
+    hist_cols = ["year", "state", "gun_type", "value", "count"]
+    if guns.empty:
+        return {col: pd.DataFrame(columns=hist_cols) for col in OUTCOME_COLUMNS}
+
+    inc_gun = (
+        guns[["incident_id", "gun_type"]]
+        .fillna({"gun_type": "Unknown"})
+        .drop_duplicates()
+        .merge(data[["incident_id", "year", "state"] + OUTCOME_COLUMNS], on="incident_id")
+    )
+
+    return {
+        col: (
+            inc_gun.groupby(["year", "state", "gun_type", col], observed=True)
+            .size()
+            .reset_index(name="count")
+            .rename(columns={col: "value"})
+        )
+        for col in OUTCOME_COLUMNS
+    }
+
+
+def _histogram_medians(hist: pd.DataFrame) -> pd.Series:
+    """Exact per-gun-type median from a (gun_type, value, count) histogram."""
+
+    hist = hist.sort_values(["gun_type", "value"])
+    grouped = hist.groupby("gun_type")["count"]
+
+    end = grouped.cumsum()
+    start = end - hist["count"]
+    total = grouped.transform("sum")
+
+    # 0-based ranks of the two middle observations (equal when the total is odd)
+    lo_rank = (total - 1) // 2
+    hi_rank = total // 2
+
+    lo = hist.loc[(start <= lo_rank) & (lo_rank < end)].set_index("gun_type")["value"]
+    hi = hist.loc[(start <= hi_rank) & (hi_rank < end)].set_index("gun_type")["value"]
+
+    return (lo + hi) / 2
+
+
+def gun_outcome_stats(histograms: dict, from_year: int, to_year: int, states) -> pd.DataFrame:
+    """Incident count, mean and median outcomes per gun type, summed from histograms."""
+
+    stats = None
+
+    for col in OUTCOME_COLUMNS:
+        h = histograms[col]
+        h = h[(h["year"] >= from_year) & (h["year"] <= to_year) & (h["state"].isin(states))]
+        h = h.groupby(["gun_type", "value"], as_index=False)["count"].sum()
+
+        h["weighted"] = h["value"] * h["count"]
+        sums = h.groupby("gun_type")[["count", "weighted"]].sum()
+
+        label = col.removeprefix("n_")
+        part = pd.DataFrame({
+            "incidents": sums["count"],
+            f"mean_{label}": sums["weighted"] / sums["count"],
+            f"median_{label}": _histogram_medians(h),
+        })
+
+        stats = part if stats is None else stats.join(part.drop(columns="incidents"))
+
+    return stats.rename_axis("gun_type").reset_index()
+
+
+def _year_offset_table(years: pd.Series) -> tuple:
+    """Map each year of a year-sorted column to its [start, stop) row offsets.
+
+    Returns ``(year_values, bounds)`` where year ``year_values[i]`` occupies
+    rows ``bounds[i]:bounds[i + 1]``.
+    """
+
+    values, starts = np.unique(years.to_numpy(), return_index=True)
+    return values, np.append(starts, len(years))
+
+
+@st.cache_resource
+def build_year_offsets() -> dict:
+    """Year-to-row-offset tables for the incident, participant and gun tables.
+
+    All three are in date order (the per-participant and per-gun tables are
+    built by walking the date-sorted incidents), so a year range is a slice.
+    """
+
+    data = load_gun_violence_data()
+    return {
+        "incidents": _year_offset_table(data["year"]),
+        "participants": _year_offset_table(build_participant_table(data)["year"]),
+        "guns": _year_offset_table(build_gun_table(data)["year"]),
+    }
+
+
+def year_slice(offsets: tuple, from_year: int, to_year: int) -> slice:
+    """Binary-search a year offset table for the rows covering ``from_year``..``to_year``."""
+
+    values, bounds = offsets
+    lo = np.searchsorted(values, from_year, side="left")
+    hi = np.searchsorted(values, to_year, side="right")
+    return slice(int(bounds[lo]), int(bounds[hi]))
+
+
+TABLE_PAGE_SIZE = 50
+
+SORT_LABELS = {
+    "date": "Date",
+    "n_killed": "Number killed",
+    "n_injured": "Number injured",
+}
+
+
+@st.cache_resource
+def build_sort_indexes() -> dict:
+    """Precompute a stable argsort of the full incident table for each sortable column."""
+
+    data = load_gun_violence_data()
+    return {
+        col: np.argsort(data[col].to_numpy(), kind="stable")
+        for col in SORT_LABELS
+        if col in data.columns
+    }
+
+
+def filtered_sort_order(sort_index: np.ndarray, positions: np.ndarray, descending: bool) -> np.ndarray:
+    """Restrict a full-table sort index to the given row positions without re-sorting."""
+
+    keep = np.zeros(len(sort_index), dtype=bool)
+    keep[positions] = True
+    order = sort_index[keep[sort_index]]
+    return order[::-1] if descending else order
+
+
+def iter_incident_csv(rows: pd.DataFrame, columns: list, text_columns: list, order: np.ndarray):
+    """Yield ``rows`` in ``order`` as CSV text, one chunk at a time with side-table text joined."""
+
+    for start in range(0, len(order), CSV_CHUNK_SIZE):
+        chunk, _ = attach_incident_text(
+            rows.loc[order[start:start + CSV_CHUNK_SIZE], ["incident_id"] + columns],
+            text_columns,
+        )
+        yield chunk.drop(columns="incident_id").to_csv(index=False, header=start == 0)
+
+
+def paginated_incident_table(rows: pd.DataFrame, columns: list, text_columns: list, key: str, height: int):
+    """Render a sortable table that only materializes and sends the current page of ``rows``."""
+
+    sort_indexes = build_sort_indexes()
+
+    n_pages = max(1, -(-len(rows) // TABLE_PAGE_SIZE))
+    page_key = key + "_page"
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    elif st.session_state[page_key] > n_pages:
+        st.session_state[page_key] = n_pages
+
+    col_sort, col_dir, col_page = st.columns([2, 1, 1])
+    with col_sort:
+        sort_col = st.selectbox(
+            "Sort by", list(sort_indexes), format_func=SORT_LABELS.get, key=key + "_sort"
+        )
+    with col_dir:
+        descending = st.toggle("Largest / newest first", value=True, key=key + "_desc")
+    with col_page:
+        page = st.number_input(
+            f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, key=page_key
+        )
+
+    order = filtered_sort_order(sort_indexes[sort_col], rows.index.to_numpy(), descending)
+
+    start = (page - 1) * TABLE_PAGE_SIZE
+    page_rows, _ = attach_incident_text(
+        rows.loc[order[start:start + TABLE_PAGE_SIZE], ["incident_id"] + columns],
+        text_columns,
+    )
+
+    st.caption(f"Rows {start + 1:,}–{start + len(page_rows):,} of {len(rows):,}")
+    st.dataframe(
+        page_rows.drop(columns="incident_id"),
+        width="stretch",
+        height=height,
+        hide_index=True,
+    )
+
+    if st.button(f"Prepare CSV of all {len(rows):,} rows", key=key + "_export"):
+        export = io.BytesIO()
+        for text in iter_incident_csv(rows, columns, text_columns, order):
+            export.write(text.encode("utf-8"))
+        export.seek(0)
+
+        st.download_button(
+            "Download CSV",
+            data=export,
+            file_name=f"team4_{key}.csv",
+            mime="text/csv",
+            key=key + "_download",
+        )
+
+
 def sidebar_multiselect_with_all(label: str, options, key_prefix: str):
     """Sidebar helper that gives an all toggle above a multiselect."""
 
@@ -231,8 +707,10 @@ def main():
 
         st.sidebar.header("Filters")
 
-        min_year = int(data["year"].min())
-        max_year = int(data["year"].max())
+        year_offsets = build_year_offsets()
+
+        min_year = int(year_offsets["incidents"][0][0])
+        max_year = int(year_offsets["incidents"][0][-1])
 
         year_range = st.sidebar.slider(
             "Year range",
@@ -243,7 +721,11 @@ def main():
 
         from_year, to_year = year_range
 
-        states = sorted(data["state"].dropna().unique())
+        year_incidents = data.iloc[year_slice(year_offsets["incidents"], from_year, to_year)]
+        p_years = participants_all.iloc[year_slice(year_offsets["participants"], from_year, to_year)]
+        g_years = guns_all.iloc[year_slice(year_offsets["guns"], from_year, to_year)]
+
+        states = sorted(year_incidents["state"].dropna().unique())
 
         selected_states = sidebar_multiselect_with_all("States to include", states, "states")
 
@@ -251,32 +733,26 @@ def main():
             st.warning("Select at least one state in the sidebar.")
             st.stop()
 
-        base_incidents = data[
-            (data["year"] >= from_year)
-            & (data["year"] <= to_year)
-            & (data["state"].isin(selected_states))
-        ]
+        if len(selected_states) == len(states):
+            base_incidents, p_base, g_base = year_incidents, p_years, g_years
+        else:
+            base_incidents = year_incidents[year_incidents["state"].isin(selected_states)]
+            p_base = p_years[p_years["state"].isin(selected_states)]
+            g_base = g_years[g_years["state"].isin(selected_states)]
 
         if base_incidents.empty:
             st.warning("No incidents match the current year and state filters.")
             st.stop()
 
-        base_incident_ids = set(base_incidents["incident_id"].unique())
-
         st.sidebar.markdown("---")
         st.sidebar.subheader("Participant filters")
 
-        p_base = participants_all[participants_all["incident_id"].isin(base_incident_ids)]
-
         role_options = sorted(p_base["participant_type"].dropna().unique()) if not p_base.empty else []
         gender_options = sorted(p_base["gender"].dropna().unique()) if not p_base.empty else []
         rel_options = sorted(p_base["relationship"].dropna().unique()) if not p_base.empty else []
 
         # start from all participants for this incident set
-        if p_base is not None and not p_base.empty:
-            pf = p_base.copy()
-        else:
-            pf = p_base
+        pf = p_base
 
         selected_roles = sidebar_multiselect_with_all("Participant role", role_options, "roles")
         selected_genders = sidebar_multiselect_with_all("Participant gender", gender_options, "gender")
@@ -287,8 +763,6 @@ def main():
         st.sidebar.markdown("---")
         st.sidebar.subheader("Gun filters")
 
-        g_base = guns_all[guns_all["incident_id"].isin(base_incident_ids)]
-
         gun_type_options = sorted(g_base["gun_type"].dropna().unique()) if not g_base.empty else []
         stolen_options = sorted(g_base["gun_stolen"].dropna().unique()) if not g_base.empty else []
 
@@ -297,7 +771,22 @@ def main():
         )
         selected_stolen = sidebar_multiselect_with_all("Gun stolen status", stolen_options, "stolen")
 
-        incident_ids = set(base_incident_ids)
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("Keyword search")
+
+        search_query = st.sidebar.text_input(
+            "Search incident characteristics and notes",
+            placeholder="for example drive-by or school",
+        )
+
+        # sorted incident ids allowed by the active filters; None while no
+        # participant, gun or search filter narrows the year/state selection
+        incident_ids = None
+
+        if search_query.strip():
+            hits = search_incidents(build_search_index(), search_query)
+            if hits is not None:
+                incident_ids = narrow_ids(incident_ids, hits)
 
         # apply participant filters to participants table and incident set
         if pf is not None and not pf.empty:
@@ -309,32 +798,40 @@ def main():
                 pf = pf[pf["relationship"].isin(selected_relationships)]
 
             if len(pf) < len(p_base):
-                incident_ids &= set(pf["incident_id"].unique())
+                incident_ids = narrow_ids(incident_ids, pf["incident_id"].to_numpy())
 
         # apply gun filters
         if g_base is not None and not g_base.empty:
-            gf = g_base.copy()
+            gf = g_base
             if selected_gun_types and len(selected_gun_types) != len(gun_type_options):
                 gf = gf[gf["gun_type"].isin(selected_gun_types)]
             if selected_stolen and len(selected_stolen) != len(stolen_options):
                 gf = gf[gf["gun_stolen"].isin(selected_stolen)]
 
             if len(gf) < len(g_base):
-                incident_ids &= set(gf["incident_id"].unique())
+                incident_ids = narrow_ids(incident_ids, gf["incident_id"].to_numpy())
 
-        filtered = base_incidents[base_incidents["incident_id"].isin(incident_ids)]
+        if incident_ids is None:
+            filtered = base_incidents
+        else:
+            filtered = base_incidents[in_sorted(base_incidents["incident_id"], incident_ids)]
 
         if filtered.empty:
             st.warning("No incidents match all selected filters.")
             st.stop()
 
         # important: participant demographics now respect participant filters, not just incident filters
-        if pf is not None:
-            p_filtered = pf[pf["incident_id"].isin(incident_ids)]
-        else:
+        if pf is None:
             p_filtered = pd.DataFrame(columns=p_base.columns if p_base is not None else [])
+        elif incident_ids is None:
+            p_filtered = pf
+        else:
+            p_filtered = pf[in_sorted(pf["incident_id"], incident_ids)]
 
-        guns_filtered = g_base[g_base["incident_id"].isin(incident_ids)]
+        if incident_ids is None:
+            guns_filtered = g_base
+        else:
+            guns_filtered = g_base[in_sorted(g_base["incident_id"], incident_ids)]
 
         total_incidents = len(filtered)
         total_killed = int(filtered["n_killed"].sum())
@@ -356,7 +853,7 @@ def main():
         st.subheader("Incidents over time")
 
         monthly_state = (
-            filtered.groupby(["month", "state"], as_index=False)
+            filtered.groupby(["month", "state"], as_index=False, observed=True)
             .agg(
                 n_incidents=("incident_id", "count"),
                 n_killed=("n_killed", "sum"),
@@ -421,7 +918,7 @@ def main():
         st.subheader("State comparison")
 
         state_summary = (
-            filtered.groupby("state", as_index=False)
+            filtered.groupby("state", as_index=False, observed=True)
             .agg(
                 incidents=("date", "count"),
                 n_killed=("n_killed", "sum"),
@@ -597,24 +1094,30 @@ def main():
                 )
                 st.altair_chart(stolen_chart, width="stretch")
 
-            st.markdown("Outcomes by gun type mean and median deaths per incident")
+            st.markdown("Outcomes by gun type mean and median deaths and injuries per incident")
 
-            inc_level = filtered[["incident_id", "n_killed", "n_injured"]].drop_duplicates()
-            inc_gun = guns_clean[["incident_id", "gun_type"]].dropna().drop_duplicates()
-            merged = inc_gun.merge(inc_level, on="incident_id", how="left")
+            if len(filtered) == len(base_incidents):
+                # only year and state filters are active, so the precomputed histograms apply
+                gun_stats = gun_outcome_stats(
+                    build_gun_outcome_histograms(), from_year, to_year, selected_states
+                )
+            else:
+                inc_level = filtered[["incident_id", "n_killed", "n_injured"]].drop_duplicates()
+                inc_gun = guns_clean[["incident_id", "gun_type"]].dropna().drop_duplicates()
+                merged = inc_gun.merge(inc_level, on="incident_id", how="left")
 
-            gun_stats = (
-                merged.groupby("gun_type", as_index=False)
-                .agg(
+                gun_stats = merged.groupby("gun_type", as_index=False).agg(
                     incidents=("incident_id", "nunique"),
                     mean_killed=("n_killed", "mean"),
                     median_killed=("n_killed", "median"),
+                    mean_injured=("n_injured", "mean"),
+                    median_injured=("n_injured", "median"),
                 )
-                .sort_values("mean_killed", ascending=False)
-            )
 
-            gun_stats["mean_killed"] = gun_stats["mean_killed"].round(2)
-            gun_stats["median_killed"] = gun_stats["median_killed"].round(2)
+            gun_stats = gun_stats.sort_values("mean_killed", ascending=False)
+
+            for c in ["mean_killed", "median_killed", "mean_injured", "median_injured"]:
+                gun_stats[c] = gun_stats[c].round(2)
 
             st.dataframe(
                 gun_stats.head(15),
@@ -628,6 +1131,7 @@ def main():
 
         if "latitude" in filtered.columns and "longitude" in filtered.columns:
             base_cols = [
+                "incident_id",
                 "latitude",
                 "longitude",
                 "date",
@@ -638,11 +1142,6 @@ def main():
                 "incident_characteristics",
             ]
 
-            extra_url_cols = ["incident_url", "source_url", "source_url_2", "source_url_3"]
-            for c in extra_url_cols:
-                if c in filtered.columns:
-                    base_cols.append(c)
-
             map_source = filtered[base_cols].dropna(subset=["latitude", "longitude"])
 
             if len(map_source) == 0:
@@ -653,7 +1152,10 @@ def main():
                 if len(map_source) > 5000:
                     map_source = map_source.sample(n=5000, random_state=0)
 
-                map_source = map_source.copy()
+                # URLs live in the side table; only read it when asked, and
+                # then only join it onto the sampled points
+                if st.checkbox("Show incident links in map tooltips", value=False, key="map_links"):
+                    map_source, _ = attach_incident_text(map_source, URL_COLUMNS)
                 map_source["date_str"] = pd.to_datetime(map_source["date"]).dt.strftime("%Y-%m-%d")
 
                 view_state = pdk.ViewState(
@@ -709,17 +1211,16 @@ def main():
 
         st.subheader("Incident links (click to open)")
 
-        link_cols = [
-            c for c in ["incident_url", "source_url", "source_url_2", "source_url_3"]
-            if c in filtered.columns
-        ]
+        link_cols = [c for c in URL_COLUMNS if c in incident_text_columns()]
 
         if link_cols:
-            link_df = (
-                filtered[["date", "state", "city_or_county", "n_killed", "n_injured"] + link_cols]
-                .sort_values("date", ascending=False)
+            paginated_incident_table(
+                filtered,
+                ["date", "state", "city_or_county", "n_killed", "n_injured"],
+                link_cols,
+                key="links",
+                height=300,
             )
-            st.dataframe(link_df, width="stretch", height=300)
         else:
             st.info("No incident links are available in this dataset.")
 
@@ -735,13 +1236,9 @@ def main():
             "n_injured",
             "incident_characteristics",
         ]
-        show_cols = [c for c in show_cols_base if c in filtered.columns] + link_cols
+        show_cols = [c for c in show_cols_base if c in filtered.columns]
 
-        st.dataframe(
-            filtered[show_cols].sort_values("date", ascending=False),
-            width="stretch",
-            height=400,
-        )
+        paginated_incident_table(filtered, show_cols, link_cols, key="raw", height=400)
 
     except Exception as e:
         st.error(
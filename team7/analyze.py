@@ -8,8 +8,10 @@ import numpy as np
 from pathlib import Path
 from scipy import stats
 
+from clean_data import load_cleaned_partitions
+
 def load_cleaned_data(data_dir=None, filename='cleaned_data.csv'):
-    """Load the cleaned dataset."""
+    """Load the cleaned dataset (a CSV, or a partitioned directory from process_dataset_chunked)."""
     if data_dir is None:
         data_dir = Path(__file__).parent.parent / "data"
     else:
@@ -19,6 +21,9 @@ def load_cleaned_data(data_dir=None, filename='cleaned_data.csv'):
     if not file_path.exists():
         raise FileNotFoundError(f"Cleaned data file not found: {file_path}")
     
+    if file_path.is_dir():
+        return load_cleaned_partitions(file_path)
+    
     df = pd.read_csv(file_path)
     return df
 
@@ -65,59 +70,116 @@ def get_state_year_columns(df):
     
     return state_col, year_col
 
+SUMMARY_STATS = ['mean', 'median', 'std', 'min', 'max', 'count']
+
+def _available_metrics(df, metrics):
+    """Keep only the metrics whose column is present in the dataframe."""
+    return {name: col for name, col in metrics.items() if col in df.columns}
+
+def grouped_statistics(df, metrics, by, sort=True):
+    """
+    Compute SUMMARY_STATS for every metric and every group in one groupby pass.
+    
+    Returns {group_key: {metric_name: {stat: value}}}. Group keys are tuples
+    when grouping by more than one column.
+    """
+    metrics = _available_metrics(df, metrics)
+    if not metrics:
+        return {}
+    
+    columns = list(dict.fromkeys(metrics.values()))
+    agg = df.groupby(by, sort=sort)[columns].agg(SUMMARY_STATS)
+    
+    result = {}
+    for key, values in agg.to_dict('index').items():
+        result[key] = {
+            name: {stat: values[(col, stat)] for stat in SUMMARY_STATS}
+            for name, col in metrics.items()
+        }
+    return result
+
 def descriptive_statistics(df, metrics, state_col, year_col):
-    """Compute descriptive statistics by state and year."""
+    """Compute descriptive statistics overall, by state, by year and by state-year."""
     stats_dict = {}
+    available = _available_metrics(df, metrics)
     
     # Overall statistics
     stats_dict['overall'] = {}
-    for metric_name, metric_col in metrics.items():
-        if metric_col in df.columns:
-            stats_dict['overall'][metric_name] = {
-                'mean': df[metric_col].mean(),
-                'median': df[metric_col].median(),
-                'std': df[metric_col].std(),
-                'min': df[metric_col].min(),
-                'max': df[metric_col].max(),
-                'count': df[metric_col].notna().sum()
-            }
-    
-    # Statistics by state
+    if available:
+        overall = df[list(dict.fromkeys(available.values()))].agg(SUMMARY_STATS)
+        for metric_name, metric_col in available.items():
+            stats_dict['overall'][metric_name] = overall[metric_col].to_dict()
+    
     if state_col:
-        stats_dict['by_state'] = {}
-        for state in df[state_col].unique():
-            state_df = df[df[state_col] == state]
-            stats_dict['by_state'][state] = {}
-            for metric_name, metric_col in metrics.items():
-                if metric_col in df.columns:
-                    stats_dict['by_state'][state][metric_name] = {
-                        'mean': state_df[metric_col].mean(),
-                        'median': state_df[metric_col].median(),
-                        'std': state_df[metric_col].std(),
-                        'min': state_df[metric_col].min(),
-                        'max': state_df[metric_col].max(),
-                        'count': state_df[metric_col].notna().sum()
-                    }
+        stats_dict['by_state'] = grouped_statistics(df, metrics, state_col, sort=False)
     
-    # Statistics by year
     if year_col:
-        stats_dict['by_year'] = {}
-        for year in sorted(df[year_col].unique()):
-            year_df = df[df[year_col] == year]
-            stats_dict['by_year'][year] = {}
-            for metric_name, metric_col in metrics.items():
-                if metric_col in df.columns:
-                    stats_dict['by_year'][year][metric_name] = {
-                        'mean': year_df[metric_col].mean(),
-                        'median': year_df[metric_col].median(),
-                        'std': year_df[metric_col].std(),
-                        'min': year_df[metric_col].min(),
-                        'max': year_df[metric_col].max(),
-                        'count': year_df[metric_col].notna().sum()
-                    }
+        stats_dict['by_year'] = grouped_statistics(df, metrics, year_col)
+    
+    if state_col and year_col:
+        stats_dict['by_state_year'] = grouped_statistics(df, metrics, [state_col, year_col])
     
     return stats_dict
 
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    """Pearson r from (possibly array-valued) counts and sums of x, y, x², y², xy."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx ** 2
+        var_y = n * syy - sy ** 2
+        r = cov / np.sqrt(var_x * var_y)
+    return np.where(n > 1, np.clip(r, -1, 1), np.nan)
+
+def _grouped_pearson(x, y, groups):
+    """Pearson r of x vs y within each group, from one groupby sum of moments."""
+    sums = pd.DataFrame({
+        'n': 1, 'sx': x, 'sy': y, 'sxx': x * x, 'syy': y * y, 'sxy': x * y
+    }).groupby(groups).sum()
+    r = _pearson_from_sums(*(sums[c].to_numpy(float) for c in ['n', 'sx', 'sy', 'sxx', 'syy', 'sxy']))
+    return pd.Series(r, index=sums.index), sums['n'].astype(int)
+
+def grouped_correlations(df, x_col, y_col, state_col):
+    """
+    Pearson and Spearman correlation of x_col vs y_col for every state in one pass.
+    
+    Only rows where both values are present are used. Spearman is Pearson on
+    within-state average ranks.
+    """
+    valid = df[[state_col, x_col, y_col]].dropna()
+    groups = valid[state_col]
+    
+    pearson, n = _grouped_pearson(valid[x_col], valid[y_col], groups)
+    ranks = valid[[x_col, y_col]].groupby(groups).rank()
+    spearman, _ = _grouped_pearson(ranks[x_col], ranks[y_col], groups)
+    
+    return pd.DataFrame({'pearson': pearson, 'spearman': spearman, 'n': n})
+
+def rolling_correlations(df, x_col, y_col, state_col, year_col, window=5, min_periods=3):
+    """
+    Rolling-window Pearson correlation of x_col vs y_col for every state at once.
+    
+    Returns a year x state matrix where each cell is the correlation over
+    the `window` years ending at that year (NaN with fewer than min_periods
+    paired observations).
+    """
+    x = pivot_metric(df, x_col, state_col, year_col)
+    y = pivot_metric(df, y_col, state_col, year_col).reindex_like(x)
+    
+    # Years with no data at all still occupy a slot in the window
+    years = np.arange(int(x.index.min()), int(x.index.max()) + 1) if len(x) else x.index
+    x, y = x.reindex(years), y.reindex(years)
+    
+    both = x.notna() & y.notna()
+    x, y = x.where(both, 0), y.where(both, 0)
+    
+    def roll(frame):
+        return frame.rolling(window, min_periods=1).sum()
+    
+    n = roll(both.astype(float))
+    r = _pearson_from_sums(n, roll(x), roll(y), roll(x * x), roll(y * y), roll(x * y))
+    r = np.where(n >= min_periods, r, np.nan)
+    return pd.DataFrame(r, index=x.index, columns=x.columns)
+
 def compute_correlations(df, metrics, state_col):
     """Compute correlations between crime and incarceration rates."""
     correlations = {}
@@ -134,53 +196,193 @@ def compute_correlations(df, metrics, state_col):
                 corr = valid_data[crime_col].corr(valid_data[incarc_col])
                 correlations['overall'] = corr
                 
-                # Correlation by state
+                # Correlation by state, all states in one grouped pass
                 if state_col:
-                    correlations['by_state'] = {}
-                    for state in df[state_col].unique():
-                        state_df = df[df[state_col] == state]
-                        state_valid = state_df[[crime_col, incarc_col]].dropna()
-                        if len(state_valid) > 1:
-                            state_corr = state_valid[crime_col].corr(state_valid[incarc_col])
-                            correlations['by_state'][state] = state_corr
+                    by_state = grouped_correlations(df, crime_col, incarc_col, state_col)
+                    by_state = by_state[by_state['n'] > 1]
+                    correlations['by_state'] = by_state['pearson'].to_dict()
+                    correlations['by_state_spearman'] = by_state['spearman'].to_dict()
     
     return correlations
 
-def analyze_trends(df, metrics, state_col, year_col, focus_state='New Mexico'):
-    """Analyze trends over time, with focus on New Mexico."""
+def pivot_metric(df, metric_col, state_col, year_col):
+    """Pivot a metric into a year x state matrix of yearly means (NaN where missing)."""
+    return df.pivot_table(index=year_col, columns=state_col, values=metric_col, aggfunc='mean').sort_index()
+
+def _ols_columns(x, Y):
+    """Closed-form least squares of every column of Y on x, ignoring NaNs per column."""
+    mask = ~np.isnan(Y)
+    n = mask.sum(axis=0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = (mask * x[:, None]).sum(axis=0) / n
+        y_mean = np.where(mask, Y, 0).sum(axis=0) / n
+        
+        dx = np.where(mask, x[:, None] - x_mean, 0)
+        dy = np.where(mask, Y - y_mean, 0)
+        
+        sxx = (dx ** 2).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+        syy = (dy ** 2).sum(axis=0)
+        
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        sse = np.clip(syy - slope * sxy, 0, None)
+        r_squared = np.where(syy > 0, 1 - sse / syy, np.nan)
+        std_err = np.where(n > 2, np.sqrt(sse / (n - 2) / sxx), np.nan)
+    
+    slope = np.where(n > 1, slope, np.nan)
+    intercept = np.where(n > 1, intercept, np.nan)
+    return slope, intercept, r_squared, std_err, n
+
+def _theil_sen_columns(x, Y):
+    """Theil-Sen estimator for every column of Y: median of all pairwise slopes."""
+    i, j = np.triu_indices(len(x), k=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pair_slopes = (Y[j] - Y[i]) / (x[j] - x[i])[:, None]
+    
+    all_nan = np.isnan(pair_slopes).all(axis=0)
+    pair_slopes[:, all_nan] = 0
+    slope = np.where(all_nan, np.nan, np.nanmedian(pair_slopes, axis=0))
+    
+    residual = Y - slope * x[:, None]
+    residual[:, all_nan] = 0
+    intercept = np.where(all_nan, np.nan, np.nanmedian(residual, axis=0))
+    return slope, intercept
+
+def batch_trends(matrix, method='ols'):
+    """
+    Fit a linear trend to every column of a year x series matrix at once.
+    
+    method is 'ols' (closed-form least squares) or 'theil_sen' (robust
+    median of pairwise slopes). Returns a dataframe indexed by series with
+    slope, intercept, r_squared, std_err and n_years; r_squared and std_err
+    always describe the OLS fit.
+    """
+    x = matrix.index.to_numpy(dtype=float)
+    Y = matrix.to_numpy(dtype=float)
+    
+    slope, intercept, r_squared, std_err, n = _ols_columns(x, Y)
+    if method == 'theil_sen':
+        slope, intercept = _theil_sen_columns(x, Y)
+    elif method != 'ols':
+        raise ValueError(f"Unknown trend method: {method}")
+    
+    return pd.DataFrame({
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': r_squared,
+        'std_err': std_err,
+        'n_years': n
+    }, index=matrix.columns)
+
+def trends_by_state(df, metrics, state_col, year_col, method='ols'):
+    """Trend statistics for every (state, metric) series, one batched fit per metric."""
+    frames = []
+    for metric_name, metric_col in _available_metrics(df, metrics).items():
+        fit = batch_trends(pivot_metric(df, metric_col, state_col, year_col), method)
+        fit.insert(0, 'metric', metric_name)
+        frames.append(fit)
+    
+    if not frames:
+        return pd.DataFrame(columns=['metric', 'slope', 'intercept', 'r_squared', 'std_err', 'n_years'])
+    return pd.concat(frames).rename_axis(state_col).reset_index()
+
+def analyze_trends(df, metrics, state_col, year_col, focus_state='New Mexico', method='ols'):
+    """Analyze trends over time for the nation and for every state, with focus on New Mexico."""
     trends = {}
     
     if not year_col or not state_col:
         return trends
     
-    # Overall trend
-    if year_col in df.columns:
-        for metric_name, metric_col in metrics.items():
-            if metric_col in df.columns:
-                yearly_avg = df.groupby(year_col)[metric_col].mean()
-                trends[f'{metric_name}_overall'] = {
-                    'slope': np.polyfit(yearly_avg.index, yearly_avg.values, 1)[0] if len(yearly_avg) > 1 else 0,
-                    'data': yearly_avg.to_dict()
-                }
+    available = _available_metrics(df, metrics)
+    
+    # Overall trend of the national yearly average, all metrics in one fit
+    yearly_avg = df.groupby(year_col)[list(dict.fromkeys(available.values()))].mean().sort_index()
+    overall_fit = batch_trends(yearly_avg, method)
+    for metric_name, metric_col in available.items():
+        trends[f'{metric_name}_overall'] = {
+            'slope': overall_fit.loc[metric_col, 'slope'] if len(yearly_avg) > 1 else 0,
+            'data': yearly_avg[metric_col].to_dict()
+        }
     
-    # New Mexico specific trends
-    if focus_state and state_col:
-        nm_df = df[df[state_col].str.contains(focus_state, case=False, na=False)]
-        if len(nm_df) > 0:
+    # Every state at once
+    trends['by_state'] = trends_by_state(df, metrics, state_col, year_col, method)
+    
+    # Focus state specific trends
+    if focus_state:
+        focus_df = df[df[state_col].str.contains(focus_state, case=False, na=False)]
+        if len(focus_df) > 0:
             trends['new_mexico'] = {}
-            for metric_name, metric_col in metrics.items():
-                if metric_col in df.columns:
-                    nm_yearly = nm_df.groupby(year_col)[metric_col].mean()
-                    if len(nm_yearly) > 1:
-                        trends['new_mexico'][metric_name] = {
-                            'slope': np.polyfit(nm_yearly.index, nm_yearly.values, 1)[0],
-                            'data': nm_yearly.to_dict()
-                        }
+            focus_yearly = focus_df.groupby(year_col)[list(dict.fromkeys(available.values()))].mean().sort_index()
+            if len(focus_yearly) > 1:
+                focus_fit = batch_trends(focus_yearly, method)
+                for metric_name, metric_col in available.items():
+                    trends['new_mexico'][metric_name] = {
+                        'slope': focus_fit.loc[metric_col, 'slope'],
+                        'data': focus_yearly[metric_col].to_dict()
+                    }
     
     return trends
 
-def compare_new_mexico(df, metrics, state_col, year_col, focus_state='New Mexico'):
-    """Compare New Mexico to other states."""
+def compare_all_states(df, metrics, state_col):
+    """
+    Compare every state to the rest of the nation for every metric at once.
+    
+    Uses per-state counts, sums and sums of squares, so the "rest" group is
+    just the national totals minus the state's own. Returns one row per
+    (state, metric) with both groups' mean and std, the mean difference and a
+    Welch t-test (t statistic, degrees of freedom, two-sided p-value).
+    """
+    frames = []
+    for metric_name, metric_col in _available_metrics(df, metrics).items():
+        values = df[metric_col]
+        valid = values.notna()
+        sums = pd.DataFrame({
+            'n': valid.astype(int),
+            's1': values.where(valid, 0),
+            's2': values.where(valid, 0) ** 2
+        }).groupby(df[state_col]).sum()
+        
+        n, s1, s2 = sums['n'].to_numpy(float), sums['s1'].to_numpy(), sums['s2'].to_numpy()
+        rest_n, rest_s1, rest_s2 = n.sum() - n, s1.sum() - s1, s2.sum() - s2
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = s1 / n
+            rest_mean = rest_s1 / rest_n
+            var = np.clip((s2 - s1 * mean) / (n - 1), 0, None)
+            rest_var = np.clip((rest_s2 - rest_s1 * rest_mean) / (rest_n - 1), 0, None)
+            
+            se_sq = var / n + rest_var / rest_n
+            t_stat = (mean - rest_mean) / np.sqrt(se_sq)
+            dof = se_sq ** 2 / ((var / n) ** 2 / (n - 1) + (rest_var / rest_n) ** 2 / (rest_n - 1))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+        
+        frames.append(pd.DataFrame({
+            'metric': metric_name,
+            'n': n.astype(int),
+            'mean': mean,
+            'std': np.sqrt(var),
+            'rest_n': rest_n.astype(int),
+            'rest_mean': rest_mean,
+            'rest_std': np.sqrt(rest_var),
+            'difference': mean - rest_mean,
+            't_statistic': t_stat,
+            'dof': dof,
+            'p_value': p_value
+        }, index=sums.index))
+    
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames).rename_axis(state_col).reset_index()
+
+def compare_new_mexico(df, metrics, state_col, year_col, focus_state='New Mexico', all_states=None):
+    """
+    Compare New Mexico (or any focus state) to other states.
+    
+    The t-test is a lookup into compare_all_states, which can be passed in
+    as all_states to avoid recomputing it for each focus state.
+    """
     comparisons = {}
     
     if not state_col:
@@ -195,6 +397,10 @@ def compare_new_mexico(df, metrics, state_col, year_col, focus_state='New Mexico
         print(f"Warning: No data found for {focus_state}")
         return comparisons
     
+    if all_states is None:
+        all_states = compare_all_states(df, metrics, state_col)
+    focus_rows = all_states[all_states[state_col].str.contains(focus_state, case=False, na=False)] if len(all_states) else all_states
+    
     comparisons['new_mexico'] = {}
     comparisons['other_states'] = {}
     comparisons['comparison'] = {}
@@ -219,19 +425,17 @@ def compare_new_mexico(df, metrics, state_col, year_col, focus_state='New Mexico
                     'std': other_values.std()
                 }
             
-            # Statistical comparison (t-test if possible)
-            if len(nm_values) > 0 and len(other_values) > 0:
-                try:
-                    t_stat, p_value = stats.ttest_ind(nm_values, other_values)
-                    comparisons['comparison'][metric_name] = {
-                        't_statistic': t_stat,
-                        'p_value': p_value,
-                        'nm_mean': nm_values.mean(),
-                        'other_mean': other_values.mean(),
-                        'difference': nm_values.mean() - other_values.mean()
-                    }
-                except:
-                    pass
+            # Welch t-test looked up from the all-states matrix (single matching state)
+            row = focus_rows[focus_rows['metric'] == metric_name] if len(focus_rows) else focus_rows
+            if len(row) == 1 and len(nm_values) > 0 and len(other_values) > 0:
+                row = row.iloc[0]
+                comparisons['comparison'][metric_name] = {
+                    't_statistic': row['t_statistic'],
+                    'p_value': row['p_value'],
+                    'nm_mean': row['mean'],
+                    'other_mean': row['rest_mean'],
+                    'difference': row['difference']
+                }
     
     return comparisons
 
@@ -1,127 +1,233 @@
 """
-Quick analysis script to find interesting findings for presentation
+Presentation findings for every state, written as Markdown and HTML reports.
+All findings (vs national average, rankings, trend change, correlation,
+incarceration-to-crime ratio, Southwest comparison, key insight) come from
+a handful of grouped aggregates computed once; the per-state reports are
+then rendered in a process pool.
+
+Usage:
+    python analyze_findings.py [cleaned_data.csv] [output_dir]
 """
+import sys
+import html
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import pandas as pd
 import numpy as np
 
-df = pd.read_csv('data/cleaned_data.csv')
-
-print("="*60)
-print("KEY FINDINGS FOR PRESENTATION")
-print("="*60)
-
-# 1. New Mexico Overview
-nm = df[df['jurisdiction'].str.contains('New Mexico', case=False, na=False)]
-other = df[~df['jurisdiction'].str.contains('New Mexico', case=False, na=False)]
-
-print("\n1. NEW MEXICO vs NATIONAL AVERAGE")
-print("-" * 60)
-print(f"New Mexico Average Crime Rate: {nm['crime_rate_per_100k'].mean():.2f} per 100k")
-print(f"National Average Crime Rate: {other['crime_rate_per_100k'].mean():.2f} per 100k")
-nm_crime_diff = ((nm['crime_rate_per_100k'].mean() / other['crime_rate_per_100k'].mean()) - 1) * 100
-print(f"New Mexico is {abs(nm_crime_diff):.1f}% {'HIGHER' if nm_crime_diff > 0 else 'LOWER'} than national average")
-
-print(f"\nNew Mexico Average Incarceration Rate: {nm['incarceration_rate_per_100k'].mean():.2f} per 100k")
-print(f"National Average Incarceration Rate: {other['incarceration_rate_per_100k'].mean():.2f} per 100k")
-nm_incarc_diff = ((nm['incarceration_rate_per_100k'].mean() / other['incarceration_rate_per_100k'].mean()) - 1) * 100
-print(f"New Mexico is {abs(nm_incarc_diff):.1f}% {'HIGHER' if nm_incarc_diff > 0 else 'LOWER'} than national average")
-
-# 2. New Mexico Rankings
-latest = df[df['year'] == 2016].copy()
-latest = latest.sort_values('crime_rate_per_100k', ascending=False)
-nm_rank_crime = (latest['crime_rate_per_100k'] > latest[latest['jurisdiction'].str.contains('New Mexico', case=False, na=False)]['crime_rate_per_100k'].values[0]).sum() + 1
-
-latest_incarc = latest.sort_values('incarceration_rate_per_100k', ascending=False)
-nm_rank_incarc = (latest_incarc['incarceration_rate_per_100k'] > latest_incarc[latest_incarc['jurisdiction'].str.contains('New Mexico', case=False, na=False)]['incarceration_rate_per_100k'].values[0]).sum() + 1
-
-print("\n2. NEW MEXICO RANKINGS (2016)")
-print("-" * 60)
-print(f"Crime Rate Rank: #{nm_rank_crime} out of {len(latest)} states (HIGHEST in nation!)")
-print(f"Incarceration Rate Rank: #{nm_rank_incarc} out of {len(latest)} states")
-
-# 3. Trends Over Time
-nm_sorted = nm.sort_values('year')
-crime_2001 = nm_sorted[nm_sorted['year'] == 2001]['crime_rate_per_100k'].values[0]
-crime_2016 = nm_sorted[nm_sorted['year'] == 2016]['crime_rate_per_100k'].values[0]
-crime_change = ((crime_2016 / crime_2001) - 1) * 100
-
-incarc_2001 = nm_sorted[nm_sorted['year'] == 2001]['incarceration_rate_per_100k'].values[0]
-incarc_2016 = nm_sorted[nm_sorted['year'] == 2016]['incarceration_rate_per_100k'].values[0]
-incarc_change = ((incarc_2016 / incarc_2001) - 1) * 100
-
-print("\n3. NEW MEXICO TRENDS (2001-2016)")
-print("-" * 60)
-print(f"Crime Rate: {crime_2001:.0f} (2001) -> {crime_2016:.0f} (2016)")
-print(f"Change: {crime_change:+.1f}%")
-print(f"\nIncarceration Rate: {incarc_2001:.0f} (2001) -> {incarc_2016:.0f} (2016)")
-print(f"Change: {incarc_change:+.1f}%")
-
-# 4. Correlation
-corr = df[['crime_rate_per_100k', 'incarceration_rate_per_100k']].corr()
-print("\n4. CORRELATION ANALYSIS")
-print("-" * 60)
-print(f"Overall Correlation (Crime vs Incarceration): {corr.iloc[0,1]:.3f}")
-if abs(corr.iloc[0,1]) < 0.3:
-    print("-> WEAK correlation - suggests complex relationship!")
-elif abs(corr.iloc[0,1]) < 0.7:
-    print("-> MODERATE correlation")
-else:
-    print("-> STRONG correlation")
-
-# 5. Divergent Trends
-print("\n5. DIVERGENT TRENDS ANALYSIS")
-print("-" * 60)
-states = df['jurisdiction'].unique()
-divergent_states = []
-for state in states:
-    s = df[df['jurisdiction'] == state].sort_values('year')
-    if len(s) > 1:
-        crime_pct = ((s.iloc[-1]['crime_rate_per_100k'] - s.iloc[0]['crime_rate_per_100k']) / s.iloc[0]['crime_rate_per_100k']) * 100
-        incarc_pct = ((s.iloc[-1]['incarceration_rate_per_100k'] - s.iloc[0]['incarceration_rate_per_100k']) / s.iloc[0]['incarceration_rate_per_100k']) * 100
-        if crime_pct < -5 and incarc_pct > 5:
-            divergent_states.append({
-                'state': state,
-                'crime_change': crime_pct,
-                'incarc_change': incarc_pct
-            })
-
-if divergent_states:
-    print(f"Found {len(divergent_states)} states where crime DECREASED but incarceration INCREASED:")
-    for d in divergent_states[:5]:
-        print(f"  {d['state']}: Crime DOWN {abs(d['crime_change']):.1f}%, Incarceration UP {d['incarc_change']:.1f}%")
-
-# 6. Ratio Analysis
-df['ratio'] = df['incarceration_rate_per_100k'] / df['crime_rate_per_100k']
-latest['ratio'] = latest['incarceration_rate_per_100k'] / latest['crime_rate_per_100k']
-latest_ratio = latest.sort_values('ratio', ascending=False)
-
-print("\n6. INCARCERATION-TO-CRIME RATIO (2016)")
-print("-" * 60)
-print("States with HIGHEST ratio (most incarceration per crime):")
-print(latest_ratio[['jurisdiction', 'ratio']].head().to_string(index=False))
-
-nm_ratio = latest[latest['jurisdiction'].str.contains('New Mexico', case=False, na=False)]['ratio'].values[0]
-nm_ratio_rank = (latest_ratio['ratio'] > nm_ratio).sum() + 1
-print(f"\nNew Mexico Ratio: {nm_ratio:.3f} (Rank: #{nm_ratio_rank})")
-
-# 7. Southwest Comparison
-print("\n7. SOUTHWEST REGIONAL COMPARISON (2016)")
-print("-" * 60)
-southwest = ['New Mexico', 'Arizona', 'Texas', 'Nevada', 'Utah', 'Colorado']
-sw_data = latest[latest['jurisdiction'].isin(southwest)].copy()
-sw_data = sw_data.sort_values('crime_rate_per_100k', ascending=False)
-print(sw_data[['jurisdiction', 'crime_rate_per_100k', 'incarceration_rate_per_100k']].to_string(index=False))
-print(f"\nSouthwest Average Crime Rate: {sw_data['crime_rate_per_100k'].mean():.2f}")
-print(f"Southwest Average Incarceration Rate: {sw_data['incarceration_rate_per_100k'].mean():.2f}")
-
-# 8. Key Insight
-print("\n8. KEY INSIGHT FOR PRESENTATION")
-print("-" * 60)
-print("New Mexico has the HIGHEST crime rate in the nation (2016)")
-print("BUT incarceration rate is only slightly above average")
-print("This suggests a DISCONNECT between crime levels and incarceration policies")
-print(f"\nThe incarceration-to-crime ratio of {nm_ratio:.3f} means that")
-print(f"for every 1000 crimes, only about {nm_ratio*1000:.0f} people are incarcerated")
-
-print("\n" + "="*60)
-
+from analyze import get_state_year_columns, grouped_correlations
+
+CRIME_COL = 'crime_rate_per_100k'
+INCARC_COL = 'incarceration_rate_per_100k'
+SOUTHWEST = ['New Mexico', 'Arizona', 'Texas', 'Nevada', 'Utah', 'Colorado']
+# Rank gap (in places) treated as a crime/incarceration disconnect
+DISCONNECT_GAP = 10
+
+def precompute_findings(df, state_col, year_col):
+    """Compute every state's findings from grouped aggregates; returns {state: facts}."""
+    df = df.copy()
+    df['ratio'] = df[INCARC_COL] / df[CRIME_COL]
+
+    # 1. State vs rest of nation: per-state sums/counts, rest = totals - state
+    sums = df.groupby(state_col)[[CRIME_COL, INCARC_COL]].agg(['sum', 'count'])
+    means, other_means = {}, {}
+    for col in [CRIME_COL, INCARC_COL]:
+        s, n = sums[(col, 'sum')], sums[(col, 'count')]
+        means[col] = s / n
+        other_means[col] = (s.sum() - s) / (n.sum() - n)
+
+    # 2. Rankings in the latest year (1 = highest)
+    latest_year = df[year_col].max()
+    latest = df[df[year_col] == latest_year].set_index(state_col)
+    ranks = latest[[CRIME_COL, INCARC_COL, 'ratio']].rank(ascending=False, method='min')
+
+    # 3. First and last year per state from one sort
+    ordered = df.sort_values(year_col)
+    first = ordered.drop_duplicates(state_col, keep='first').set_index(state_col)
+    last = ordered.drop_duplicates(state_col, keep='last').set_index(state_col)
+    change = (last[[CRIME_COL, INCARC_COL]] / first[[CRIME_COL, INCARC_COL]] - 1) * 100
+    divergent = (change[CRIME_COL] < -5) & (change[INCARC_COL] > 5)
+
+    # 4. Correlation overall and within each state
+    overall_corr = df[[CRIME_COL, INCARC_COL]].corr().iloc[0, 1]
+    state_corr = grouped_correlations(df, CRIME_COL, INCARC_COL, state_col)
+
+    # 5. Southwest regional comparison in the latest year
+    southwest = latest.loc[latest.index.isin(SOUTHWEST), [CRIME_COL, INCARC_COL]]
+    southwest = southwest.sort_values(CRIME_COL, ascending=False)
+
+    national = {
+        'latest_year': int(latest_year),
+        'n_ranked': len(latest),
+        'overall_corr': overall_corr,
+        'n_divergent': int(divergent.sum()),
+        'top_ratios': latest['ratio'].sort_values(ascending=False).head(5).to_dict(),
+        'southwest': southwest.to_dict('index'),
+        'southwest_crime_mean': southwest[CRIME_COL].mean(),
+        'southwest_incarc_mean': southwest[INCARC_COL].mean()
+    }
+
+    findings = {}
+    for state in sums.index:
+        findings[state] = {
+            'state': state,
+            'national': national,
+            'crime_mean': means[CRIME_COL][state],
+            'crime_other_mean': other_means[CRIME_COL][state],
+            'incarc_mean': means[INCARC_COL][state],
+            'incarc_other_mean': other_means[INCARC_COL][state],
+            'crime_rank': ranks[CRIME_COL].get(state, np.nan),
+            'incarc_rank': ranks[INCARC_COL].get(state, np.nan),
+            'ratio': latest['ratio'].get(state, np.nan),
+            'ratio_rank': ranks['ratio'].get(state, np.nan),
+            'first_year': int(first.loc[state, year_col]),
+            'last_year': int(last.loc[state, year_col]),
+            'crime_first': first.loc[state, CRIME_COL],
+            'crime_last': last.loc[state, CRIME_COL],
+            'incarc_first': first.loc[state, INCARC_COL],
+            'incarc_last': last.loc[state, INCARC_COL],
+            'crime_change': change.loc[state, CRIME_COL],
+            'incarc_change': change.loc[state, INCARC_COL],
+            'divergent': bool(divergent.get(state, False)),
+            'pearson': state_corr['pearson'].get(state, np.nan),
+            'spearman': state_corr['spearman'].get(state, np.nan)
+        }
+    return findings
+
+def _versus(value, other):
+    """Describe value relative to other as '12.3% HIGHER' / 'LOWER'."""
+    diff = (value / other - 1) * 100
+    return f"{abs(diff):.1f}% {'HIGHER' if diff > 0 else 'LOWER'}"
+
+def _strength(corr):
+    """Classify a correlation coefficient."""
+    if pd.isna(corr):
+        return "n/a"
+    if abs(corr) < 0.3:
+        return "WEAK"
+    elif abs(corr) < 0.7:
+        return "MODERATE"
+    return "STRONG"
+
+def _fmt_rank(rank):
+    """Format a rank that may be missing."""
+    return "n/a" if pd.isna(rank) else f"#{int(rank)}"
+
+def _fmt_corr(corr):
+    """Format a correlation that may be missing."""
+    return "n/a" if pd.isna(corr) else f"{corr:.3f}"
+
+def _key_insight(f):
+    """Headline comparing a state's crime and incarceration standing."""
+    state, nat = f['state'], f['national']
+    lines = [
+        f"{state} ranks {_fmt_rank(f['crime_rank'])} in crime rate and "
+        f"{_fmt_rank(f['incarc_rank'])} in incarceration rate ({nat['latest_year']})"
+    ]
+    if not (pd.isna(f['crime_rank']) or pd.isna(f['incarc_rank'])):
+        if f['incarc_rank'] - f['crime_rank'] >= DISCONNECT_GAP:
+            lines.append("Crime ranks well above incarceration: a DISCONNECT between crime levels "
+                         "and incarceration policies")
+        elif f['crime_rank'] - f['incarc_rank'] >= DISCONNECT_GAP:
+            lines.append("Incarceration ranks well above crime: incarceration is high relative to crime levels")
+        else:
+            lines.append("Crime and incarceration rankings are broadly in line")
+    if not pd.isna(f['ratio']):
+        lines.append(f"For every 1,000 crimes, about {f['ratio'] * 1000:.0f} people are incarcerated")
+    return lines
+
+def build_sections(f):
+    """Turn one state's facts into a list of (heading, lines) report sections."""
+    state, nat = f['state'], f['national']
+    return [
+        (f"1. {state} vs National Average", [
+            f"Average crime rate: {f['crime_mean']:.2f} per 100k (rest of nation: {f['crime_other_mean']:.2f})",
+            f"{state} is {_versus(f['crime_mean'], f['crime_other_mean'])} than the national average",
+            f"Average incarceration rate: {f['incarc_mean']:.2f} per 100k (rest of nation: {f['incarc_other_mean']:.2f})",
+            f"{state} is {_versus(f['incarc_mean'], f['incarc_other_mean'])} than the national average",
+        ]),
+        (f"2. Rankings ({nat['latest_year']})", [
+            f"Crime rate rank: {_fmt_rank(f['crime_rank'])} out of {nat['n_ranked']} states",
+            f"Incarceration rate rank: {_fmt_rank(f['incarc_rank'])} out of {nat['n_ranked']} states",
+        ]),
+        (f"3. Trends ({f['first_year']}-{f['last_year']})", [
+            f"Crime rate: {f['crime_first']:.0f} ({f['first_year']}) -> {f['crime_last']:.0f} ({f['last_year']}), "
+            f"change {f['crime_change']:+.1f}%",
+            f"Incarceration rate: {f['incarc_first']:.0f} ({f['first_year']}) -> {f['incarc_last']:.0f} ({f['last_year']}), "
+            f"change {f['incarc_change']:+.1f}%",
+            ("Divergent: crime DOWN but incarceration UP" if f['divergent'] else "Not a divergent-trend state")
+            + f" ({nat['n_divergent']} states nationally)",
+        ]),
+        ("4. Correlation Analysis", [
+            f"Overall correlation (all states): {_fmt_corr(nat['overall_corr'])} ({_strength(nat['overall_corr'])})",
+            f"Within {state}: Pearson {_fmt_corr(f['pearson'])} ({_strength(f['pearson'])}), "
+            f"Spearman {_fmt_corr(f['spearman'])}",
+        ]),
+        (f"5. Incarceration-to-Crime Ratio ({nat['latest_year']})", [
+            f"{state} ratio: {f['ratio']:.3f} (rank {_fmt_rank(f['ratio_rank'])}), "
+            f"about {f['ratio'] * 1000:.0f} people incarcerated per 1,000 crimes",
+            "Highest ratios: " + ", ".join(f"{s} {r:.3f}" for s, r in nat['top_ratios'].items()),
+        ]),
+        (f"6. Southwest Regional Comparison ({nat['latest_year']})", [
+            f"{s}: crime {v[CRIME_COL]:.2f}, incarceration {v[INCARC_COL]:.2f} per 100k"
+            for s, v in nat['southwest'].items()
+        ] + [
+            f"Southwest average crime rate: {nat['southwest_crime_mean']:.2f}",
+            f"Southwest average incarceration rate: {nat['southwest_incarc_mean']:.2f}",
+        ]),
+        ("7. Key Insight", _key_insight(f)),
+    ]
+
+def render_markdown(state, sections):
+    """Render report sections as Markdown."""
+    parts = [f"# Key Findings: {state}", ""]
+    for heading, lines in sections:
+        parts += [f"## {heading}", ""] + [f"- {line}" for line in lines] + [""]
+    return "\n".join(parts)
+
+def render_html(state, sections):
+    """Render report sections as a standalone HTML page."""
+    body = [f"<h1>Key Findings: {html.escape(state)}</h1>"]
+    for heading, lines in sections:
+        body.append(f"<h2>{html.escape(heading)}</h2>")
+        body.append("<ul>" + "".join(f"<li>{html.escape(line)}</li>" for line in lines) + "</ul>")
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(state)} Findings</title>"
+            f"</head><body>\n" + "\n".join(body) + "\n</body></html>\n")
+
+def _slug(state):
+    """File-name friendly state name."""
+    return "".join(c if c.isalnum() else "_" for c in state.lower()).strip("_")
+
+def write_state_report(facts, output_dir):
+    """Render and write one state's Markdown and HTML report; returns the file stem."""
+    state = facts['state']
+    sections = build_sections(facts)
+    stem = _slug(state)
+    output_dir = Path(output_dir)
+    (output_dir / f"{stem}.md").write_text(render_markdown(state, sections), encoding="utf-8")
+    (output_dir / f"{stem}.html").write_text(render_html(state, sections), encoding="utf-8")
+    return stem
+
+def generate_reports(data_file='data/cleaned_data.csv', output_dir='data/reports', jobs=None):
+    """Write a findings report for every state, rendering in a process pool."""
+    df = pd.read_csv(data_file)
+    state_col, year_col = get_state_year_columns(df)
+    findings = precompute_findings(df, state_col, year_col)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    states = sorted(findings)
+    # spawn, not fork: the pipeline calls this from a worker thread while other stages run
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        stems = list(pool.map(write_state_report, [findings[s] for s in states], [output_dir] * len(states)))
+
+    index = ["# Key Findings by State", ""] + [f"- [{s}]({stem}.md)" for s, stem in zip(states, stems)]
+    (output_dir / "index.md").write_text("\n".join(index) + "\n", encoding="utf-8")
+
+    print(f"Wrote {len(states)} state reports to {output_dir}")
+    return output_dir
+
+if __name__ == "__main__":
+    generate_reports(*sys.argv[1:3])
@@ -12,7 +12,10 @@ import sys
 sys.path.append(str(Path(__file__).parent))
 
 from clean_data import load_raw_data, identify_key_columns, standardize_column_names
-from analyze import identify_metric_columns, get_state_year_columns
+from analyze import (
+    identify_metric_columns, get_state_year_columns, pivot_metric, batch_trends, compare_all_states,
+    grouped_correlations, rolling_correlations
+)
 import visualizations as viz
 
 # Page configuration
@@ -48,8 +51,11 @@ def load_data():
     base_dir = Path(__file__).resolve().parent
     data_dir = base_dir
     
-    # Try to load cleaned data first
+    # Try to load cleaned data first: next to the app, then in the shared
+    # data directory the cleaning scripts and pipeline.py write to
     cleaned_file = data_dir / "cleaned_data.csv"
+    if not cleaned_file.exists():
+        cleaned_file = base_dir.parent / "data" / "cleaned_data.csv"
     if cleaned_file.exists():
         df = pd.read_csv(cleaned_file)
         # Identify columns
@@ -71,6 +77,26 @@ def load_data():
         st.info("Please run the data download and cleaning scripts first.")
         return None, {}, None, None, False
 
+@st.cache_data
+def compute_state_trends(df, metric_col, state_col, year_col, method):
+    """Rank every state by the trend of one metric (batched fit, cached per method)."""
+    ranking = batch_trends(pivot_metric(df, metric_col, state_col, year_col), method)
+    ranking = ranking.sort_values('slope', ascending=False)
+    ranking.insert(0, 'rank', np.arange(1, len(ranking) + 1))
+    return ranking.rename_axis('State').reset_index()
+
+@st.cache_data
+def compute_state_comparisons(df, metrics, state_col):
+    """Every state vs the rest of the nation for every metric, computed once per filter."""
+    return compare_all_states(df, metrics, state_col)
+
+@st.cache_data
+def compute_state_correlations(df, x_col, y_col, state_col, year_col, window):
+    """Per-state Pearson/Spearman and rolling-window correlations, all states at once."""
+    by_state = grouped_correlations(df, x_col, y_col, state_col)
+    rolling = rolling_correlations(df, x_col, y_col, state_col, year_col, window=window)
+    return by_state, rolling
+
 def main():
     """Main application function."""
     # Header
@@ -147,11 +173,12 @@ def main():
         selected_metric_col = None
     
     # Main content tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    tab1, tab2, tab3, tab4, tab_corr, tab5, tab6 = st.tabs([
         "Overview", 
         "Trends Over Time", 
         "State Comparisons", 
         "Relationships",
+        "Correlation Over Time",
         "New Mexico Focus",
         "Key Findings"
     ])
@@ -185,15 +212,45 @@ def main():
         st.header("Trends Over Time")
         
         if selected_metric_col and state_col and year_col:
+            trend_states = sorted(df[state_col].dropna().unique())
+            highlight_state = st.selectbox(
+                "Highlight State",
+                options=trend_states,
+                index=trend_states.index('New Mexico') if 'New Mexico' in trend_states else 0,
+                help="Drawn in red on top of the other states"
+            ) if trend_states else None
+            
             fig = viz.plot_trends_over_time(
                 df, selected_metric_col, state_col, year_col,
                 selected_states=selected_states if selected_states else None,
-                highlight_state='New Mexico'
+                highlight_state=highlight_state
             )
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("Unable to create trend chart. Check data availability.")
+            
+            # Trend ranking across every state (uses the year filter only)
+            st.subheader("All States Ranked by Trend")
+            trend_method = st.radio(
+                "Trend estimator",
+                options=['ols', 'theil_sen'],
+                format_func=lambda m: {'ols': "Least squares (OLS)", 'theil_sen': "Robust (Theil-Sen)"}[m],
+                horizontal=True
+            )
+            ranking = compute_state_trends(df_original, selected_metric_col, state_col, year_col, trend_method)
+            st.dataframe(
+                ranking.rename(columns={
+                    'rank': 'Rank',
+                    'slope': 'Slope (per year)',
+                    'intercept': 'Intercept',
+                    'r_squared': 'R²',
+                    'std_err': 'Std. Error',
+                    'n_years': 'Years'
+                }).round(3),
+                use_container_width=True,
+                hide_index=True
+            )
         else:
             st.warning("Required columns (metric, state, year) not available.")
     
@@ -270,6 +327,39 @@ def main():
         else:
             st.warning("Need at least 2 metrics for relationship analysis.")
     
+    # Tab: Correlation Over Time
+    with tab_corr:
+        st.header("Crime vs Incarceration Correlation by State")
+        
+        crime_col = metrics.get('crime_rate')
+        incarc_col = metrics.get('incarceration_rate')
+        
+        if state_col and year_col and crime_col in df.columns and incarc_col in df.columns:
+            window = st.slider("Rolling window (years)", min_value=3, max_value=10, value=5, step=1)
+            
+            by_state, rolling = compute_state_correlations(
+                df_original, crime_col, incarc_col, state_col, year_col, window
+            )
+            
+            fig_rolling = viz.plot_rolling_correlation_heatmap(rolling, window, highlight_state='New Mexico')
+            if fig_rolling:
+                st.plotly_chart(fig_rolling, use_container_width=True)
+            else:
+                st.info("Not enough years in the selected range for a rolling correlation.")
+            
+            st.subheader("Correlation Over the Whole Period")
+            st.dataframe(
+                by_state.rename_axis('State').reset_index().rename(columns={
+                    'pearson': 'Pearson r',
+                    'spearman': 'Spearman ρ',
+                    'n': 'Years'
+                }).sort_values('Pearson r', ascending=False).round(3),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.warning("Crime rate and incarceration rate columns are required for this analysis.")
+    
     # Tab 5: New Mexico Focus
     with tab5:
         st.header("New Mexico Analysis")
@@ -307,6 +397,41 @@ def main():
                 st.warning("No New Mexico data found in the filtered dataset.")
         else:
             st.warning("New Mexico data not available. Check state column and data filters.")
+        
+        # Any state vs the rest of the nation (lookup into a precomputed table)
+        st.markdown("---")
+        st.subheader("Compare Any State to the Rest of the Nation")
+        
+        if state_col and selected_metric_col:
+            comparison_table = compute_state_comparisons(df_original, metrics, state_col)
+            metric_name = next(name for name, col in metrics.items() if col == selected_metric_col)
+            metric_rows = comparison_table[comparison_table['metric'] == metric_name]
+            
+            focus_options = sorted(metric_rows[state_col].unique())
+            if focus_options:
+                focus_state = st.selectbox(
+                    "Focus State",
+                    options=focus_options,
+                    index=focus_options.index('New Mexico') if 'New Mexico' in focus_options else 0
+                )
+                row = metric_rows[metric_rows[state_col] == focus_state].iloc[0]
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric(f"{focus_state} Mean", f"{row['mean']:.2f}")
+                with col2:
+                    st.metric("Rest of Nation Mean", f"{row['rest_mean']:.2f}")
+                with col3:
+                    st.metric("Difference", f"{row['difference']:.2f}")
+                with col4:
+                    st.metric("p-value (Welch t-test)", f"{row['p_value']:.4f}")
+                
+                with st.expander("All states vs the rest of the nation"):
+                    st.dataframe(
+                        metric_rows.drop(columns='metric').sort_values('difference', ascending=False).round(3),
+                        use_container_width=True,
+                        hide_index=True
+                    )
     
     # Tab 6: Key Findings
     with tab6:
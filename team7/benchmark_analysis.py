@@ -0,0 +1,114 @@
+"""
+Benchmarks for the analysis and visualization modules.
+Scales the cleaned dataset up to county-like sizes and times the vectorized
+analysis functions against the original per-group loops, and the WebGL trend
+chart against the one-trace-per-state chart.
+
+Usage:
+    python benchmark_analysis.py [scale]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from analyze import (
+    identify_metric_columns, get_state_year_columns, descriptive_statistics, trends_by_state
+)
+from visualizations import plot_trends_over_time
+
+def load_scaled_data(scale=100):
+    """Replicate cleaned_data.csv `scale` times as distinct pseudo-counties."""
+    df = pd.read_csv(Path(__file__).parent / "cleaned_data.csv")
+    state_col, year_col = get_state_year_columns(df)
+
+    rng = np.random.default_rng(0)
+    parts = []
+    for i in range(scale):
+        part = df.copy()
+        part[state_col] = part[state_col] + f" County {i}"
+        numeric_cols = part.select_dtypes(include=[np.number]).columns.drop(year_col)
+        part[numeric_cols] = part[numeric_cols] * rng.uniform(0.8, 1.2, size=(len(part), len(numeric_cols)))
+        parts.append(part)
+
+    return pd.concat(parts, ignore_index=True)
+
+def descriptive_statistics_loop(df, metrics, state_col, year_col):
+    """Original implementation: one boolean mask and six reductions per group."""
+    def summarize(sub):
+        return {
+            metric_name: {
+                'mean': sub[metric_col].mean(),
+                'median': sub[metric_col].median(),
+                'std': sub[metric_col].std(),
+                'min': sub[metric_col].min(),
+                'max': sub[metric_col].max(),
+                'count': sub[metric_col].notna().sum()
+            }
+            for metric_name, metric_col in metrics.items() if metric_col in df.columns
+        }
+
+    return {
+        'overall': summarize(df),
+        'by_state': {state: summarize(df[df[state_col] == state]) for state in df[state_col].unique()},
+        'by_year': {year: summarize(df[df[year_col] == year]) for year in sorted(df[year_col].unique())},
+    }
+
+def trends_by_state_loop(df, metrics, state_col, year_col):
+    """One np.polyfit per (state, metric) series, as the original focus-state code did."""
+    slopes = {}
+    for state in df[state_col].unique():
+        state_df = df[df[state_col] == state]
+        for metric_name, metric_col in metrics.items():
+            yearly = state_df.groupby(year_col)[metric_col].mean().dropna()
+            if len(yearly) > 1:
+                slopes[(state, metric_name)] = np.polyfit(yearly.index, yearly.values, 1)[0]
+    return slopes
+
+def time_call(func, *args):
+    """Return (seconds, result) for a single call."""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def run_benchmarks(scale=100):
+    """Time loop vs vectorized implementations and print the speedups."""
+    df = load_scaled_data(scale)
+    metrics = identify_metric_columns(df)
+    state_col, year_col = get_state_year_columns(df)
+
+    print(f"Rows: {len(df):,}  States/counties: {df[state_col].nunique():,}  Years: {df[year_col].nunique()}")
+    print("-" * 60)
+
+    loop_time, loop_result = time_call(descriptive_statistics_loop, df, metrics, state_col, year_col)
+    vec_time, vec_result = time_call(descriptive_statistics, df, metrics, state_col, year_col)
+
+    some_state = next(iter(loop_result['by_state']))
+    for metric_name in metrics:
+        assert np.isclose(
+            loop_result['by_state'][some_state][metric_name]['median'],
+            vec_result['by_state'][some_state][metric_name]['median'],
+            equal_nan=True
+        )
+
+    print(f"descriptive_statistics: loop {loop_time:.3f}s  vectorized {vec_time:.3f}s  "
+          f"speedup {loop_time / vec_time:.1f}x")
+
+    loop_time, _ = time_call(trends_by_state_loop, df, metrics, state_col, year_col)
+    vec_time, _ = time_call(trends_by_state, df, metrics, state_col, year_col)
+    print(f"trends_by_state:        loop {loop_time:.3f}s  vectorized {vec_time:.3f}s  "
+          f"speedup {loop_time / vec_time:.1f}x")
+
+    metric_col = next(iter(metrics.values()))
+    sizes = {}
+    for mode in ['traces', 'webgl']:
+        build_time, fig = time_call(
+            lambda: plot_trends_over_time(df, metric_col, state_col, year_col, render_mode=mode)
+        )
+        sizes[mode] = (build_time, len(fig.to_json()))
+    print(f"plot_trends_over_time:  traces {sizes['traces'][0]:.3f}s / {sizes['traces'][1]:,} bytes  "
+          f"webgl {sizes['webgl'][0]:.3f}s / {sizes['webgl'][1]:,} bytes")
+
+if __name__ == "__main__":
+    run_benchmarks(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -3,12 +3,15 @@ Data cleaning and preprocessing module.
 Handles missing values, standardizes units, calculates per-capita metrics,
 and filters data from 2000 onward.
 """
+import os
+import sys
+import shutil
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-def load_raw_data(data_dir=None):
-    """Load raw dataset files from data directory."""
+def find_raw_data_file(data_dir=None):
+    """Locate the main raw dataset file in the data directory."""
     if data_dir is None:
         data_dir = Path(__file__).parent.parent / "data"
     else:
@@ -33,6 +36,12 @@ def load_raw_data(data_dir=None):
     if main_file is None:
         main_file = csv_files[0]
     
+    return main_file, data_dir
+
+def load_raw_data(data_dir=None):
+    """Load raw dataset files from data directory."""
+    main_file, data_dir = find_raw_data_file(data_dir)
+    
     print(f"Loading data from: {main_file.name}")
     df = pd.read_csv(main_file)
     
@@ -98,9 +107,10 @@ def identify_key_columns(df):
         'property_crime': property_col
     }
 
-def calculate_per_capita_metrics(df, key_cols):
+def calculate_per_capita_metrics(df, key_cols, copy=True):
     """Calculate per-capita metrics for crime and incarceration."""
-    df = df.copy()
+    if copy:
+        df = df.copy()
     
     # Calculate total crime if needed (violent + property)
     if key_cols['crime'] == 'total_crime_calculated':
@@ -133,9 +143,10 @@ def calculate_per_capita_metrics(df, key_cols):
     
     return df
 
-def clean_data(df, key_cols):
+def clean_data(df, key_cols, copy=True):
     """Main data cleaning function."""
-    df = df.copy()
+    if copy:
+        df = df.copy()
     
     # Filter data from 2000 onward
     if key_cols['year']:
@@ -169,8 +180,8 @@ def clean_data(df, key_cols):
     
     return df
 
-def process_dataset(data_dir=None, output_file='cleaned_data.csv'):
-    """Main function to process the entire dataset."""
+def process_dataset(data_dir=None, output_file='cleaned_data.csv', output_dir=None):
+    """Main function to process the entire dataset (output_dir defaults to data_dir)."""
     print("Loading raw data...")
     df, data_dir = load_raw_data(data_dir)
     
@@ -195,7 +206,7 @@ def process_dataset(data_dir=None, output_file='cleaned_data.csv'):
     df_clean = calculate_per_capita_metrics(df_clean, key_cols)
     
     # Save cleaned data
-    output_path = data_dir / output_file
+    output_path = Path(output_dir or data_dir) / output_file
     df_clean.to_csv(output_path, index=False)
     print(f"\nCleaned dataset saved to: {output_path}")
     print(f"Cleaned dataset shape: {df_clean.shape}")
@@ -206,6 +217,124 @@ def process_dataset(data_dir=None, output_file='cleaned_data.csv'):
     
     return df_clean, key_cols
 
+def _chunk_schema(df, year_col):
+    """Storage dtype per column: numbers -> float64, bools -> nullable boolean, rest -> string."""
+    schema = {}
+    for col in df.columns.drop(year_col, errors='ignore'):
+        if pd.api.types.is_bool_dtype(df[col]):
+            schema[col] = 'boolean'
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            schema[col] = 'float64'
+        else:
+            schema[col] = 'string'
+    return schema
+
+def _apply_schema(df, schema):
+    """Cast a chunk to the schema so every parquet part file has the same column types."""
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            df[col] = pd.Series(pd.NA, index=df.index, dtype=dtype)
+        elif dtype == 'float64':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def _write_partitions(df, year_col, output_dir, part_name):
+    """Append one cleaned chunk to the year-partitioned parquet output."""
+    for year, part in df.groupby(year_col):
+        partition_dir = output_dir / f"{year_col}={int(year)}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        part.drop(columns=year_col).to_parquet(partition_dir / f"{part_name}.parquet", index=False)
+
+def _compact_partition(partition_dir):
+    """Merge a partition's chunk files into one file, dropping duplicates across chunks."""
+    part_files = sorted(partition_dir.glob("part-*.parquet"))
+    df = pd.concat([pd.read_parquet(f) for f in part_files], ignore_index=True)
+    df = df.drop_duplicates()
+    
+    tmp_file = partition_dir / "data.parquet.tmp"
+    df.to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, partition_dir / "data.parquet")
+    
+    for f in part_files:
+        f.unlink()
+    return len(df)
+
+def process_dataset_chunked(data_dir=None, output_dir='cleaned_data', chunksize=100_000):
+    """
+    Process the raw dataset in bounded memory, chunk by chunk.
+    
+    Applies the same steps as process_dataset (column detection, negative
+    value nulling, per-capita metrics, de-duplication) but writes
+    year-partitioned parquet files under data_dir/output_dir. Duplicates
+    always share a year, so they are removed per partition, and peak memory
+    is bounded by the chunk size and the largest single year.
+    """
+    main_file, data_dir = find_raw_data_file(data_dir)
+    output_path = data_dir / output_dir
+    staging_path = data_dir / f"{output_dir}.tmp"
+    
+    if staging_path.exists():
+        shutil.rmtree(staging_path)
+    
+    print(f"Streaming raw data from: {main_file.name} ({chunksize:,} rows per chunk)")
+    
+    key_cols = None
+    schema = None
+    rows_in = 0
+    for i, chunk in enumerate(pd.read_csv(main_file, chunksize=chunksize)):
+        rows_in += len(chunk)
+        chunk = standardize_column_names(chunk)
+        
+        # Column detection is name-based, so the first chunk decides for all
+        if key_cols is None:
+            key_cols = identify_key_columns(chunk)
+            if not key_cols['year']:
+                raise ValueError("A year column is required for partitioned output")
+            print("\nIdentified key columns:")
+            for key, value in key_cols.items():
+                print(f"  {key}: {value}")
+        
+        chunk = clean_data(chunk, key_cols, copy=False)
+        chunk = calculate_per_capita_metrics(chunk, key_cols, copy=False)
+        
+        # Keep a stable schema across chunks and partitions: the first cleaned
+        # chunk decides every column's type and later chunks are cast to it
+        if schema is None:
+            schema = _chunk_schema(chunk, key_cols['year'])
+        chunk = _apply_schema(chunk, schema)
+        
+        _write_partitions(chunk, key_cols['year'], staging_path, f"part-{i:05d}")
+    
+    rows_out = 0
+    partitions = sorted(p for p in staging_path.glob("*=*") if p.is_dir()) if staging_path.exists() else []
+    for partition_dir in partitions:
+        rows_out += _compact_partition(partition_dir)
+    
+    # Swap the finished output into place
+    if output_path.exists():
+        shutil.rmtree(output_path)
+    if staging_path.exists():
+        os.replace(staging_path, output_path)
+    
+    print(f"\nRows read: {rows_in:,}  Rows written: {rows_out:,}  Partitions: {len(partitions)}")
+    print(f"Cleaned partitions saved to: {output_path}")
+    
+    return output_path, key_cols
+
+def load_cleaned_partitions(path):
+    """Load year-partitioned parquet output back into a single dataframe."""
+    df = pd.read_parquet(path)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Partition keys come back as categories of strings
+            df[col] = pd.to_numeric(df[col].astype(str), errors='coerce')
+    return df
+
 if __name__ == "__main__":
-    process_dataset()
+    if "--chunked" in sys.argv:
+        process_dataset_chunked()
+    else:
+        process_dataset()
 
@@ -36,16 +36,12 @@ def setup_kaggle_credentials():
     
     return credentials
 
-# Set up credentials BEFORE importing Kaggle API
-setup_kaggle_credentials()
-
-# Now import Kaggle API (it will use the credentials we just set up)
-from kaggle.api.kaggle_api_extended import KaggleApi
-
-def download_dataset():
+def download_dataset(data_dir=None):
     """Download the crime and incarceration dataset from Kaggle."""
-    # Set up credentials
+    # Set up credentials BEFORE importing Kaggle API; importing it is what
+    # authenticates, so keep both out of module import time
     setup_kaggle_credentials()
+    from kaggle.api.kaggle_api_extended import KaggleApi
     
     # Initialize Kaggle API
     api = KaggleApi()
@@ -53,8 +49,10 @@ def download_dataset():
     
     # Dataset information
     dataset_name = "christophercorrea/prisoners-and-crime-in-united-states"
-    data_dir = Path(__file__).parent.parent / "data"
-    data_dir.mkdir(exist_ok=True)
+    if data_dir is None:
+        data_dir = Path(__file__).parent.parent / "data"
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"Downloading dataset: {dataset_name}")
     print(f"Destination: {data_dir}")
@@ -0,0 +1,177 @@
+"""
+Pipeline runner for download -> clean -> analyze -> findings.
+Each stage declares its inputs, outputs and code files. A stage is skipped
+when the content hash of those inputs and code matches the last successful
+run, and stages whose dependencies are done run in parallel. Outputs go to
+the same data directory the other scripts and app.py use (../data).
+
+Usage:
+    python pipeline.py --raw-fixture fixtures/crime_and_incarceration_by_state.csv
+    python pipeline.py --force
+"""
+import argparse
+import hashlib
+import json
+import pickle
+import shutil
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+# Same data root as download_data, clean_data, analyze and app.py
+DEFAULT_DATA_DIR = BASE_DIR.parent / "data"
+STATE_FILE = ".pipeline_state.json"
+
+def run_download(data_dir, raw_fixture=None):
+    """Copy the local raw-data fixture into place, or download from Kaggle."""
+    raw_dir = data_dir / "raw"
+    if raw_dir.exists():
+        shutil.rmtree(raw_dir)
+    raw_dir.mkdir(parents=True)
+
+    if raw_fixture:
+        fixture = Path(raw_fixture)
+        files = sorted(fixture.glob("*.csv")) if fixture.is_dir() else [fixture]
+        for f in files:
+            shutil.copy2(f, raw_dir / f.name)
+        print(f"[download] Copied {len(files)} fixture file(s) to {raw_dir}")
+    else:
+        from download_data import download_dataset
+        download_dataset(raw_dir)
+
+def run_clean(data_dir, raw_fixture=None):
+    """Clean the raw data into data/cleaned_data.csv."""
+    from clean_data import process_dataset
+    process_dataset(data_dir / "raw", output_dir=data_dir)
+
+def run_analyze(data_dir, raw_fixture=None):
+    """Run the statistical analysis and pickle its results."""
+    from analyze import run_analysis
+    results = run_analysis(data_dir)
+    with open(data_dir / "analysis_results.pkl", "wb") as f:
+        pickle.dump(results, f)
+
+def run_findings(data_dir, raw_fixture=None):
+    """Write the per-state findings reports."""
+    from analyze_findings import generate_reports
+    generate_reports(data_dir / "cleaned_data.csv", data_dir / "reports")
+
+# Stage definitions: paths are relative to the data directory (inputs/outputs)
+# or to this directory (code)
+STAGES = {
+    'download': {
+        'deps': [],
+        'inputs': [],
+        'outputs': ['raw'],
+        'code': ['download_data.py', 'pipeline.py'],
+        'run': run_download
+    },
+    'clean': {
+        'deps': ['download'],
+        'inputs': ['raw'],
+        'outputs': ['cleaned_data.csv'],
+        'code': ['clean_data.py'],
+        'run': run_clean
+    },
+    'analyze': {
+        'deps': ['clean'],
+        'inputs': ['cleaned_data.csv'],
+        'outputs': ['analysis_results.pkl'],
+        'code': ['analyze.py', 'clean_data.py'],
+        'run': run_analyze
+    },
+    'findings': {
+        'deps': ['clean'],
+        'inputs': ['cleaned_data.csv'],
+        'outputs': ['reports'],
+        'code': ['analyze_findings.py', 'analyze.py'],
+        'run': run_findings
+    }
+}
+
+def _hash_path(hasher, path):
+    """Feed a file, or every file under a directory, into the hasher."""
+    path = Path(path)
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for f in files:
+        hasher.update(f.name.encode())
+        if f.exists():
+            with open(f, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    hasher.update(block)
+
+def stage_hash(name, data_dir, raw_fixture=None):
+    """Content hash of a stage's inputs, code and (for download) fixture."""
+    stage = STAGES[name]
+    hasher = hashlib.sha256(name.encode())
+    for rel in stage['inputs']:
+        _hash_path(hasher, data_dir / rel)
+    for rel in stage['code']:
+        _hash_path(hasher, BASE_DIR / rel)
+    if name == 'download':
+        hasher.update(str(bool(raw_fixture)).encode())
+        if raw_fixture:
+            _hash_path(hasher, raw_fixture)
+    return hasher.hexdigest()
+
+def load_state(data_dir):
+    """Load stage hashes from the last successful runs."""
+    state_path = data_dir / STATE_FILE
+    if state_path.exists():
+        return json.loads(state_path.read_text())
+    return {}
+
+def save_state(data_dir, state):
+    """Persist stage hashes."""
+    (data_dir / STATE_FILE).write_text(json.dumps(state, indent=2))
+
+def run_pipeline(data_dir=None, raw_fixture=None, force=False, jobs=4):
+    """Run every stage whose inputs or code changed; returns {stage: 'ran' | 'skipped'}."""
+    data_dir = Path(data_dir or DEFAULT_DATA_DIR)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    state = load_state(data_dir)
+    status = {}
+
+    def execute(name):
+        # Hash after dependencies finished, so changed upstream outputs are seen
+        digest = stage_hash(name, data_dir, raw_fixture)
+        outputs_exist = all((data_dir / rel).exists() for rel in STAGES[name]['outputs'])
+        if not force and outputs_exist and state.get(name) == digest:
+            print(f"[{name}] up to date, skipping")
+            return name, digest, 'skipped'
+
+        print(f"[{name}] running")
+        STAGES[name]['run'](data_dir, raw_fixture)
+        return name, digest, 'ran'
+
+    pending = set(STAGES)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            ready = [n for n in pending if all(d in status for d in STAGES[n]['deps'])]
+            for name in ready:
+                pending.discard(name)
+                running[pool.submit(execute, name)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.pop(future)
+                name, digest, outcome = future.result()
+                state[name] = digest
+                status[name] = outcome
+                save_state(data_dir, state)
+
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=None,
+                        help="Working data directory (default: ../data, shared with the other scripts)")
+    parser.add_argument("--raw-fixture", default=None,
+                        help="Local raw CSV file or directory to use instead of downloading")
+    parser.add_argument("--force", action="store_true", help="Rerun every stage")
+    parser.add_argument("--jobs", type=int, default=4, help="Maximum stages to run in parallel")
+    args = parser.parse_args()
+
+    result = run_pipeline(args.data_dir, args.raw_fixture, args.force, args.jobs)
+    print("\n" + ", ".join(f"{name}: {outcome}" for name, outcome in result.items()))
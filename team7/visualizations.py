@@ -9,10 +9,16 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 
 def plot_trends_over_time(df, metric_col, state_col, year_col, 
-                          selected_states=None, highlight_state='New Mexico'):
+                          selected_states=None, highlight_state='New Mexico',
+                          render_mode='webgl'):
     """
     Create line graph showing trends over time by state.
     
+    In 'webgl' render mode all non-highlighted states are drawn as a single
+    Scattergl trace (series separated by NaN gaps) and the highlighted state
+    as a second one; use the highlight_state picker instead of legend
+    toggling to bring a state forward. 'traces' mode draws one trace per state.
+    
     Parameters:
     -----------
     df : DataFrame
@@ -27,6 +33,8 @@ def plot_trends_over_time(df, metric_col, state_col, year_col,
         List of states to include. If None, includes all states.
     highlight_state : str
         State to highlight (default: 'New Mexico')
+    render_mode : str
+        'webgl' (two traces) or 'traces' (one trace per state)
     
     Returns:
     --------
@@ -44,6 +52,68 @@ def plot_trends_over_time(df, metric_col, state_col, year_col,
     if len(plot_df) == 0:
         return None
     
+    if render_mode == 'webgl':
+        fig = _trends_webgl_figure(plot_df, metric_col, state_col, year_col, highlight_state)
+    else:
+        fig = _trends_per_state_figure(plot_df, metric_col, state_col, year_col, highlight_state)
+    
+    fig.update_layout(
+        title=f'Trends Over Time: {metric_col.replace("_", " ").title()}',
+        xaxis_title='Year',
+        yaxis_title=metric_col.replace("_", " ").title(),
+        hovermode='closest',
+        height=500,
+        showlegend=True
+    )
+    
+    return fig
+
+def _trends_webgl_figure(plot_df, metric_col, state_col, year_col, highlight_state):
+    """Background states as one NaN-separated Scattergl trace, highlight as a second."""
+    fig = go.Figure()
+    
+    # One sort groups every state's points contiguously and in year order
+    plot_df = plot_df.sort_values([state_col, year_col])
+    if highlight_state:
+        is_highlight = plot_df[state_col].str.lower() == highlight_state.lower()
+    else:
+        is_highlight = pd.Series(False, index=plot_df.index)
+    background = plot_df[~is_highlight]
+    highlight = plot_df[is_highlight]
+    
+    if len(background) > 0:
+        states = background[state_col].to_numpy(dtype=object)
+        breaks = np.flatnonzero(states[1:] != states[:-1]) + 1
+        years = background[year_col].to_numpy()
+        fig.add_trace(go.Scattergl(
+            # a NaN in y alone breaks the line, so x stays an integer array
+            # (compact in the figure JSON) and y is stored as float32
+            x=np.insert(years, breaks, years[breaks - 1]),
+            y=np.insert(background[metric_col].to_numpy(dtype=np.float32), breaks, np.nan),
+            mode='lines+markers',
+            name='Other states',
+            line=dict(width=2, color='lightgray'),
+            marker=dict(size=4),
+            opacity=0.6,
+            connectgaps=False,
+            # no per-point state names: they would dominate the figure JSON
+            hovertemplate='%{x}: %{y:.2f}<extra>Other states</extra>'
+        ))
+    
+    if len(highlight) > 0:
+        fig.add_trace(go.Scattergl(
+            x=highlight[year_col],
+            y=highlight[metric_col],
+            mode='lines+markers',
+            name=highlight[state_col].iloc[0],
+            line=dict(width=4, color='red'),
+            marker=dict(size=8)
+        ))
+    
+    return fig
+
+def _trends_per_state_figure(plot_df, metric_col, state_col, year_col, highlight_state):
+    """One Scatter trace per state (legend toggling per state)."""
     fig = go.Figure()
     
     # Get unique states
@@ -74,15 +144,6 @@ def plot_trends_over_time(df, metric_col, state_col, year_col,
                 opacity=0.6
             ))
     
-    fig.update_layout(
-        title=f'Trends Over Time: {metric_col.replace("_", " ").title()}',
-        xaxis_title='Year',
-        yaxis_title=metric_col.replace("_", " ").title(),
-        hovermode='closest',
-        height=500,
-        showlegend=True
-    )
-    
     return fig
 
 def plot_state_rankings(df, metric_col, state_col, year=None, top_n=20):
@@ -424,3 +485,51 @@ def plot_state_distribution(df, metric_col, state_col, year=None):
     
     return fig
 
+
+def plot_rolling_correlation_heatmap(corr_matrix, window, highlight_state='New Mexico'):
+    """
+    Create heatmap of rolling-window correlations by state and year.
+    
+    Parameters:
+    -----------
+    corr_matrix : DataFrame
+        Year x state matrix of correlations (from analyze.rolling_correlations)
+    window : int
+        Window length in years, used for the title
+    highlight_state : str
+        State whose label is marked on the y-axis
+    
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+    """
+    matrix = corr_matrix.dropna(how='all').dropna(axis=1, how='all')
+    
+    if matrix.empty:
+        return None
+    
+    # States on the y-axis, years on the x-axis
+    matrix = matrix.T.sort_index(ascending=False)
+    labels = [f'★ {state}' if highlight_state and state.lower() == highlight_state.lower() else state
+              for state in matrix.index]
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=matrix.values,
+        x=matrix.columns,
+        y=labels,
+        colorscale='RdBu',
+        zmin=-1,
+        zmax=1,
+        zmid=0,
+        colorbar=dict(title="Correlation"),
+        hovertemplate='%{y}<br>Window ending %{x}<br>r = %{z:.2f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'Rolling {window}-Year Correlation: Crime vs Incarceration',
+        xaxis_title='Window End Year',
+        yaxis_title='',
+        height=max(500, len(labels) * 16)
+    )
+    
+    return fig